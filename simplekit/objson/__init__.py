@@ -3,8 +3,19 @@ Used to deserialize and serialize json
 """
 
 # from .dolphin import load, loads, dump, dumps
+from .backend import set_backend, get_backend, register_backend
+from .columnar import loads_columnar
 from .dolphin import make_dynamic_class
-from .dolphin2 import loads, load, dump, dumps, empty
+from .instrument import stats, reset_stats, enable_stats, set_slow_hook
+from .dolphin2 import loads, load, dump, dumps, iterdumps, empty, freeze, clone, track
+from .parallel import loads_many
+from .path import compile_path
+from .schema import compile
+from .stream import iterload, load_path, load_lines, dump_lines
 
 __author__ = 'benjamin.c.yan'
-__all__ = ["load", "loads", "dump", "dumps", "make_dynamic_class"]
+__all__ = ["load", "loads", "dump", "dumps", "iterdumps", "iterload", "load_path", "load_lines", "dump_lines", "loads_many",
+           "loads_columnar",
+           "make_dynamic_class", "compile", "compile_path", "freeze", "clone", "track",
+           "set_backend", "get_backend", "register_backend",
+           "stats", "reset_stats", "enable_stats", "set_slow_hook"]
@@ -0,0 +1,75 @@
+"""
+Registry of the json modules used by objson to parse and serialize text
+"""
+import importlib
+import json
+import logging
+
+__author__ = 'benjamin.c.yan'
+
+try:
+    _string_types = basestring
+except NameError:
+    _string_types = str
+
+logger = logging.getLogger('objson')
+
+_registry = {
+    'stdlib': 'json',
+    'simplejson': 'simplejson',
+}
+
+_backend = json
+
+
+def register_backend(name, backend):
+    """register a backend by name, so :func:`set_backend` can select it
+
+    :param name: :class:`str`, the name of backend
+    :param backend: a module name, or an object which provides ``load``, ``loads``,
+        ``dump`` and ``dumps`` with the same interface as :mod:`json`
+    """
+    _registry[name] = backend
+
+
+def _resolve(backend):
+    if backend in _registry:
+        backend = _registry[backend]
+    if isinstance(backend, _string_types):
+        backend = importlib.import_module(str(backend))
+    missing = [name for name in ('load', 'loads', 'dump', 'dumps') if not callable(getattr(backend, name, None))]
+    if missing:
+        raise TypeError('json backend does not provide: %s' % ', '.join(missing))
+    return backend
+
+
+def set_backend(backend):
+    """select the json backend used by :func:`objson.loads`, :func:`objson.dumps` and the like
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> objson.set_backend('simplejson')
+
+    When the backend is an optional module which is not installed, objson falls
+    back to the standard library :mod:`json`.
+
+    :param backend: ``'stdlib'``, ``'simplejson'``, a registered name, or an object
+        which provides ``load``, ``loads``, ``dump`` and ``dumps``
+    :return: the backend in use
+    """
+    global _backend
+    try:
+        _backend = _resolve(backend)
+    except ImportError:
+        logger.warning('json backend %r is not installed, fall back to stdlib', backend)
+        _backend = json
+    return _backend
+
+
+def get_backend():
+    """the json backend in use
+
+    :return: a module or an object like :mod:`json`
+    """
+    return _backend
@@ -0,0 +1,167 @@
+"""
+Streaming gzip and zlib codecs of the json files
+"""
+import io
+import zlib
+
+__author__ = 'benjamin.c.yan'
+
+try:
+    _string_types = basestring
+except NameError:
+    _string_types = str
+
+COMPRESSIONS = ('gzip', 'zlib', 'auto')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_LEVEL = 6
+
+_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'zlib': zlib.MAX_WBITS}
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+# the file name extensions of ``compression='auto'`` in :func:`writer`
+_EXTENSIONS = (('.gz', 'gzip'), ('.gzip', 'gzip'), ('.zz', 'zlib'), ('.zlib', 'zlib'))
+
+
+def check(compression):
+    """
+    :raise ValueError: ``compression`` is not one of :data:`COMPRESSIONS`
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError('unknown compression: %r, expecting one of %s' % (compression, ', '.join(COMPRESSIONS)))
+
+
+def detect(head):
+    """the compression of a stream by its first two bytes
+
+    :param head: :class:`bytes`
+    :return: ``'gzip'``, ``'zlib'`` or ``None`` for the data which is not compressed
+    """
+    head = bytearray(head[:2])
+    if head == bytearray(_GZIP_MAGIC):
+        return 'gzip'
+    # deflate method with the 32K window of every zlib encoder, 'x', and a header checksum
+    # of multiple of 31, no json text starts like this
+    if len(head) == 2 and head[0] == 0x78 and (head[0] << 8 | head[1]) % 31 == 0:
+        return 'zlib'
+    return None
+
+
+def _finished(decompressor):
+    """whether ``decompressor`` has read the end of its stream, the trailer included,
+    asked before its ``flush``
+    """
+    if getattr(decompressor, 'eof', False):
+        return True
+    # python 2 has no ``eof``, a finished stream leaves any more data unused
+    probe = decompressor.copy()
+    try:
+        probe.decompress(b'\x00')
+    except zlib.error:
+        return False
+    return bool(probe.unused_data)
+
+
+class _Decompressor(object):
+    """A binary file object reading the decompressed data of ``fp``
+
+    Each :meth:`read` decompresses at most ``size`` bytes from one chunk of
+    ``fp``, so neither the compressed nor the decompressed data is held whole.
+    The concatenated gzip members are read one after another, a stream which
+    stops before its end raises :class:`ValueError`.
+    """
+
+    def __init__(self, fp, compression, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._pending = fp.read(chunk_size)
+        if compression == 'auto':
+            compression = detect(self._pending)
+        self._wbits = _WBITS.get(compression)
+        self._decompressor = zlib.decompressobj(self._wbits) if self._wbits is not None else None
+
+    def read(self, size=-1):
+        if self._decompressor is None:
+            data, self._pending = self._pending, b''
+            if not data:
+                return self._fp.read(size)
+            if 0 <= size < len(data):
+                data, self._pending = data[:size], data[size:]
+            return data
+
+        decompressor = self._decompressor
+        try:
+            while True:
+                data, self._pending = self._pending or self._fp.read(self._chunk_size), b''
+                if not data:
+                    if not _finished(decompressor):
+                        raise ValueError('truncated compressed data')
+                    return decompressor.flush()
+                data = decompressor.decompress(data, max(size, 0))
+                self._pending = decompressor.unconsumed_tail
+                if decompressor.unused_data:
+                    # the next member of a gzip file
+                    self._pending = decompressor.unused_data
+                    decompressor = self._decompressor = zlib.decompressobj(self._wbits)
+                if data:
+                    return data
+        except zlib.error as e:
+            raise ValueError('invalid compressed data: %s' % e)
+
+
+class _Compressor(object):
+    """A file object compressing the text written into ``fp``, :meth:`close` writes the end
+    of the stream, ``fp`` stays open. The text is only encoded to UTF-8 if ``compression``
+    is ``None``.
+    """
+
+    def __init__(self, fp, compression, level=DEFAULT_LEVEL):
+        self._fp = fp
+        self._compressor = None
+        if compression is not None:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[compression])
+
+    def write(self, text):
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+        if self._compressor is not None:
+            text = self._compressor.compress(text)
+        if text:
+            self._fp.write(text)
+
+    def close(self):
+        if self._compressor is not None:
+            self._fp.write(self._compressor.flush())
+
+
+def reader(fp, compression, chunk_size=DEFAULT_CHUNK_SIZE):
+    """a binary file object which decompresses ``fp`` as it is read
+
+    :param fp: binary file object
+    :param compression: ``'gzip'``, ``'zlib'`` or ``'auto'``, which detects the
+        compression by the magic bytes, the data which is not compressed is read as is
+    :return: file object
+    """
+    check(compression)
+    return _Decompressor(fp, compression, chunk_size)
+
+
+def writer(fp, compression):
+    """a file object which compresses the text written into ``fp``, ``close`` it to
+    finish the stream
+
+    :param fp: binary file object
+    :param compression: ``'gzip'``, ``'zlib'`` or ``'auto'``, which picks by the
+        extension of ``fp.name``, ``.gz`` or ``.zz``, the other files get the text as is
+    :return: file object, ``None`` if ``'auto'`` finds ``fp`` is a text file which is not compressed
+    """
+    check(compression)
+    if compression == 'auto':
+        name = getattr(fp, 'name', None)
+        name = name.lower() if isinstance(name, _string_types) else ''
+        compression = next((kind for extension, kind in _EXTENSIONS if name.endswith(extension)), None)
+        if compression is None and isinstance(fp, io.TextIOBase):
+            return None
+    return _Compressor(fp, compression)
@@ -1,16 +1,151 @@
+import collections
 import json
 import itertools
 import functools
+import threading
 
+from . import dynamic_class as _dynamic_class
+from . import instrument
 from .dynamic_class import make_dynamic_class
 
 __author__ = 'benjamin.c.yan'
 
-_knapsack = {}
+DEFAULT_CACHE_SIZE = 1024
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses evictions maxsize currsize')
 
 seed = itertools.count(1)
 
 
+class ShapeCache(object):
+    """A least recently used cache of the dynamic classes, keyed by the key set of json object
+
+    The cache is safe to share between threads. A lookup of a cached shape takes
+    no lock: the recency is a stamp from a shared counter written in a single
+    dict assignment. The lock is taken only to create a class, so two threads
+    never create two classes of a shape, and to evict.
+
+    The classes are queued in the order they are created. The eviction pops the
+    head of the queue, the class used since it was queued gets a second chance
+    at the tail, so an eviction takes amortized constant time.
+
+    :param maxsize: :class:`int`, the maximum number of classes kept, ``None`` means unbounded
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be a positive integer or None')
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._classes = {}
+        self._stamps = {}
+        self._queue = collections.deque()
+        self._clock = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._classes)
+
+    def get(self, shape):
+        """get the dynamic class of ``shape``, create it if absent
+
+        :param shape: :class:`frozenset`, the keys of json object
+        :return: a class type
+        """
+        dynamic_class = self._classes.get(shape)
+        if dynamic_class is None:
+            return self._create(shape)
+        self._stamps[shape] = next(self._clock)
+        # not atomic, the statistics may lose a few hits under threads
+        self.hits += 1
+        return dynamic_class
+
+    def _create(self, shape):
+        with self._lock:
+            classes = self._classes
+            dynamic_class = classes.get(shape)
+            stamp = next(self._clock)
+            if dynamic_class is not None:
+                # created by another thread meanwhile
+                self.hits += 1
+            else:
+                self.misses += 1
+                dynamic_class = make_dynamic_class(_random_name(), shape)
+                if instrument.active:
+                    instrument.count('shape_classes')
+                if self.maxsize is not None:
+                    self._evict(self.maxsize - 1)
+                classes[shape] = dynamic_class
+                self._queue.append((stamp, shape))
+            self._stamps[shape] = stamp
+            return dynamic_class
+
+    def _evict(self, size):
+        """drop the least recently used classes until ``size`` are left, the lock is held"""
+        classes = self._classes
+        stamps = self._stamps
+        queue = self._queue
+        while len(classes) > size:
+            queued, victim = queue.popleft()
+            stamp = stamps.get(victim, queued)
+            if stamp > queued:
+                queue.append((stamp, victim))
+                continue
+            _dynamic_class._unregister(classes.pop(victim))
+            stamps.pop(victim, None)
+            self.evictions += 1
+        if len(stamps) > 2 * len(classes) + 64:
+            # the stamps written by lookups racing with an eviction
+            self._stamps = dict((shape, stamps.get(shape, -1)) for shape in classes)
+
+    def resize(self, maxsize):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be a positive integer or None')
+        with self._lock:
+            self.maxsize = maxsize
+            if maxsize is not None:
+                self._evict(maxsize)
+
+    def clear(self):
+        with self._lock:
+            for dynamic_class in self._classes.values():
+                _dynamic_class._unregister(dynamic_class)
+            self._classes.clear()
+            self._stamps.clear()
+            self._queue.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._classes))
+
+
+_knapsack = ShapeCache()
+
+# the unpickled Dolphin instances share the classes of the decoded ones
+_dynamic_class._caches['Dolphin'] = lambda field_names: _knapsack.get(frozenset(field_names))
+
+
+def set_cache_size(maxsize):
+    """set the maximum number of shape classes kept by :func:`object_hook`
+
+    :param maxsize: :class:`int`, ``None`` means unbounded
+    """
+    _knapsack.resize(maxsize)
+
+
+def cache_info():
+    """statistics of the shape class cache
+
+    :return: :class:`CacheInfo`, ``(hits, misses, evictions, maxsize, currsize)``
+    """
+    return _knapsack.info()
+
+
+def clear_cache():
+    """drop all the shape classes and reset the statistics"""
+    _knapsack.clear()
+
+
 def object2dict(obj):
     d = {}
     for key in obj:
@@ -19,15 +154,8 @@ def object2dict(obj):
 
 
 def object_hook(obj):
-    unique_id = tuple((key, type(obj[key])) for key in sorted(obj.keys()))
-    if unique_id in _knapsack:
-        dynamic_class = _knapsack[unique_id]
-    else:
-        dynamic_class = make_dynamic_class(_random_name(), obj.keys())
-        _knapsack[unique_id] = dynamic_class
-
-    obj = dynamic_class(obj)
-    return obj
+    dynamic_class = _knapsack.get(frozenset(obj))
+    return dynamic_class(obj)
 
 
 def _random_name():
@@ -1,21 +1,138 @@
+import codecs
+import collections
 import functools
 import json
 import re
+from array import array
 from keyword import iskeyword
 
+from . import compression as _compression
+from . import instrument
+from .backend import get_backend
+from .interning import make_pairs_hook
+
 __author__ = 'benjamin.c.yan'
 
+try:
+    _string_types = basestring
+except NameError:
+    _string_types = str
+
 _re_encode = re.compile('[^a-zA-Z0-9]', re.MULTILINE)
 
+# the bytes merged into one ``write`` by :func:`dump` and one piece of :func:`iterdumps`
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# the containers with more members, nested ones included, are encoded member
+# by member by :func:`iterdumps`
+SPLIT_SIZE = 256
+
+_aliases = {}
+
+ALIAS_CACHE_SIZE = 4096
+
+
+def _alias(name):
+    """the json key escaped by the attribute name, ``None`` if the name is not escaped
+
+    The result only depends on the name, so it's cached.
+    """
+    try:
+        return _aliases[name]
+    except KeyError:
+        pass
+    if name.startswith('m') and (iskeyword(name[1:]) or len(name) > 1 and name[1].isdigit()):
+        key = name[1:]
+    elif '_' in name:
+        key = _re_encode.sub('-', name)
+    else:
+        key = None
+    if len(_aliases) >= ALIAS_CACHE_SIZE:
+        _aliases.clear()
+    _aliases[name] = key
+    return key
+
 
 def object2dict(obj):
-    return obj.__dict__
+    if type(obj) is Dolphin:
+        return obj.__dict__
+    elif isinstance(obj, Dolphin):
+        return obj._mapping()
+    if isinstance(obj, array):
+        # the numeric columns of :mod:`columnar` and :meth:`Path.many`
+        return obj.tolist()
+    try:
+        return obj.__dict__
+    except AttributeError:
+        pass
+    if hasattr(type(obj), '__slots__'):
+        # instances of the ``__slots__`` classes of :func:`make_dynamic_class` and the
+        # rows of :class:`columnar.Table`, they are mappings of their fields
+        return dict((key, obj[key]) for key in obj)
+    raise TypeError('%r is not JSON serializable' % (obj,))
 
 
 def object_hook(obj):
     return Dolphin(obj)
 
 
+def _lazy(value):
+    if isinstance(value, dict):
+        return LazyDolphin(value)
+    elif isinstance(value, list):
+        return [_lazy(item) for item in value]
+    return value
+
+
+def _rebuild(value):
+    """turn the dicts of a plain decoded value into :class:`Dolphin` in place"""
+    kind = type(value)
+    if kind is dict:
+        for key, item in value.items():
+            if type(item) in (dict, list):
+                value[key] = _rebuild(item)
+        return _adopt(value)
+    elif kind is list:
+        for i, item in enumerate(value):
+            if type(item) in (dict, list):
+                value[i] = _rebuild(item)
+    return value
+
+
+def _projection(fields):
+    """normalize a projection spec to a dict of name to the spec of its value,
+    ``None`` keeps the whole value
+    """
+    if isinstance(fields, _string_types):
+        fields = fields.replace(',', ' ').split()
+    if not isinstance(fields, dict):
+        return dict((name, None) for name in fields)
+    return dict((name, None if spec is None or spec is True else _projection(spec))
+                for name, spec in fields.items())
+
+
+def _project(value, spec, wrap, factory):
+    """keep the properties of ``spec`` in the objects of a plain decoded value,
+    the lists are walked through
+    """
+    if isinstance(value, list):
+        return [_project(item, spec, wrap, factory) for item in value]
+    elif not isinstance(value, dict):
+        return value
+    kept = {}
+    for name, sub in spec.items():
+        if name in value:
+            item = value[name]
+            kept[name] = wrap(item) if sub is None else _project(item, sub, wrap, factory)
+    return factory(kept)
+
+
+def _adopt(kv):
+    obj = Dolphin.__new__(Dolphin)
+    obj.__dict__ = kv
+    return obj
+
+
 def empty(other=None):
     """
     new an empty object
@@ -36,7 +153,7 @@ class Dolphin(object):
     def __init__(self, other=None):
         if other:
             if isinstance(other, Dolphin):
-                other = other.__dict__
+                other = other._mapping()
 
             self.__dict__.update(other)
 
@@ -53,26 +170,466 @@ class Dolphin(object):
         if not key.startswith('_'):
             self.__dict__[key] = value
 
+    def __contains__(self, key):
+        return str(key) in self.__dict__
+
     def __getattr__(self, name):
         name = str(name)
         if not name.startswith('_'):
             if name in self:
                 return self[name]
-            elif name.startswith('m') and (iskeyword(name[1:]) or len(name) > 1 and name[1].isdigit()):
-                return self[name[1:]]
-            elif '_' in name:
-                return self[_re_encode.sub('-', name)]
+            key = _alias(name)
+            if key is not None:
+                return self[key]
 
     def __str__(self):
         return '%s (%s)' % (self.__class__.__name__, repr(self))
 
     def __repr__(self):
-        keys = sorted(self.__dict__.keys())
+        keys = sorted(self)
         text = ', '.join('%s=%r' % (key, self[key]) for key in keys)
         return '{%s}' % text
 
     def __eq__(self, other):
-        return str(self) == str(other)
+        """structural equality, a :class:`Dolphin` equals the objects and dicts
+        which hold the same properties, the comparison stops at the first difference
+        """
+        if self is other:
+            return True
+        if isinstance(other, FrozenDolphin) and not isinstance(self, FrozenDolphin):
+            # the lists equal the tuples of a frozen copy
+            return other.__eq__(self)
+        if isinstance(other, Dolphin):
+            other = other._mapping()
+        elif not isinstance(other, dict):
+            return NotImplemented
+        return self._mapping() == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    # mutable, use :func:`freeze` to get a hashable copy
+    __hash__ = None
+
+    def __reduce__(self):
+        return self.__class__, (), self._mapping()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def _mapping(self):
+        """the dict holding the properties, used to serialize the object"""
+        return self.__dict__
+
+
+class LazyDolphin(Dolphin):
+    """A :class:`Dolphin` over a plain decoded dict
+
+    The nested dicts and lists are wrapped only when they are accessed,
+    the wrapper is cached afterwards. The changes are written through to
+    the underlying dict, so it always holds the current properties.
+    """
+    __slots__ = ('_raw',)
+
+    def __init__(self, raw=None):
+        object.__setattr__(self, '_raw', {} if raw is None else raw)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __contains__(self, key):
+        return str(key) in self._raw
+
+    def __getattr__(self, name):
+        if not name.startswith('_') and name in self._raw:
+            return self._materialize(name)
+        return Dolphin.__getattr__(self, name)
+
+    def __getitem__(self, key):
+        key = str(key)
+        if not key.startswith('_'):
+            try:
+                return self.__dict__[key]
+            except KeyError:
+                pass
+            if key in self._raw:
+                return self._materialize(key)
+
+    def _materialize(self, key):
+        raw = self._raw
+        value = raw[key]
+        if isinstance(value, (dict, list)):
+            value = raw[key] = _lazy(value)
+        self.__dict__[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        key = str(key)
+        if not key.startswith('_'):
+            self._raw[key] = value
+            self.__dict__[key] = value
+
+    def __setattr__(self, name, value):
+        self._raw[name] = value
+        self.__dict__[name] = value
+
+    def __delattr__(self, name):
+        if name not in self._raw:
+            raise AttributeError(name)
+        del self._raw[name]
+        self.__dict__.pop(name, None)
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_raw', dict(state))
+
+    def _mapping(self):
+        return self._raw
+
+
+class CowDolphin(LazyDolphin):
+    """A copy-on-write view of a decoded object, made by :func:`clone`
+
+    The view reads the dict of the original object until it is changed, then
+    it works on a shallow copy of that dict. The nested objects are wrapped by
+    views on access, so a change copies only the objects along its path. The
+    lists are copied shallowly when they are accessed.
+
+    The parts of the original which are not copied yet show through, so keep
+    the original unchanged while the clone is in use.
+    """
+    __slots__ = ('_owned',)
+
+    def __init__(self, raw=None):
+        super(CowDolphin, self).__init__(raw)
+        object.__setattr__(self, '_owned', raw is None)
+
+    def _own(self):
+        if not self._owned:
+            raw = dict(self._raw)
+            raw.update(self.__dict__)
+            object.__setattr__(self, '_raw', raw)
+            object.__setattr__(self, '_owned', True)
+
+    def _materialize(self, key):
+        value = self._raw[key]
+        if isinstance(value, (Dolphin, dict, list)):
+            value = clone(value)
+            if self._owned:
+                self._raw[key] = value
+        self.__dict__[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._own()
+        super(CowDolphin, self).__setitem__(key, value)
+
+    def __setattr__(self, name, value):
+        self._own()
+        super(CowDolphin, self).__setattr__(name, value)
+
+    def __delattr__(self, name):
+        self._own()
+        super(CowDolphin, self).__delattr__(name)
+
+    def __setstate__(self, state):
+        super(CowDolphin, self).__setstate__(state)
+        object.__setattr__(self, '_owned', True)
+
+    def _mapping(self):
+        if self._owned or not self.__dict__:
+            return self._raw
+        mapping = dict(self._raw)
+        mapping.update(self.__dict__)
+        return mapping
+
+
+def clone(value):
+    """a copy-on-write copy of ``value``, the cost does not depend on the size of ``value``
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> template = objson.loads('{"Image": "web", "HostConfig": {"NetworkMode": "bridge"}}')
+    >>> body = objson.clone(template)
+    >>> body.HostConfig.NetworkMode = 'host'
+    >>> assert template.HostConfig.NetworkMode == 'bridge'
+
+    :param value: :class:`Dolphin`, :class:`dict`, :class:`list` or a scalar
+    :return: :class:`CowDolphin` for the objects, a new :class:`list` of clones for the lists
+    """
+    if isinstance(value, Dolphin):
+        return CowDolphin(value._mapping())
+    elif isinstance(value, dict):
+        return CowDolphin(value)
+    elif isinstance(value, list):
+        return [clone(item) for item in value]
+    return value
+
+
+class FrozenDolphin(Dolphin):
+    """An immutable :class:`Dolphin`, the nested objects are frozen too and the
+    lists become tuples. The hash is computed once, so it can be used as a dict
+    key or set member efficiently.
+    """
+    __slots__ = ('_hash',)
+
+    def __init__(self, other=None):
+        object.__setattr__(self, '_hash', None)
+        if other:
+            if isinstance(other, Dolphin):
+                other = other._mapping()
+            self.__dict__.update((key, freeze(value)) for key, value in other.items())
+
+    def __setitem__(self, key, value):
+        raise TypeError('%s is immutable' % self.__class__.__name__)
+
+    def __setattr__(self, name, value):
+        raise TypeError('%s is immutable' % self.__class__.__name__)
+
+    def __delattr__(self, name):
+        raise TypeError('%s is immutable' % self.__class__.__name__)
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(frozenset(self.__dict__.items())))
+        return self._hash
+
+    def __eq__(self, other):
+        """structural equality, the objects and dicts which are not frozen are compared by
+        their frozen copy, so ``freeze(obj) == obj`` holds when ``obj`` has lists
+        """
+        if self is other:
+            return True
+        if isinstance(other, (Dolphin, dict)) and not isinstance(other, FrozenDolphin):
+            other = freeze(other)
+        if isinstance(other, FrozenDolphin) and hash(self) != hash(other):
+            return False
+        return Dolphin.__eq__(self, other)
+
+
+def freeze(value):
+    """an immutable and hashable copy of ``value``
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> containers = objson.loads('[{"Image": "web", "Ports": [80]}, {"Image": "web", "Ports": [80]}]')
+    >>> assert len(set(objson.freeze(container) for container in containers)) == 1
+
+    :param value: :class:`Dolphin`, :class:`dict`, :class:`list` or a scalar
+    :return: :class:`FrozenDolphin` for the objects, :class:`tuple` for the lists
+    """
+    if isinstance(value, FrozenDolphin):
+        return value
+    elif isinstance(value, (Dolphin, dict)):
+        return FrozenDolphin(value)
+    elif isinstance(value, (list, tuple)):
+        return tuple([freeze(item) for item in value])
+    return value
+
+
+class _Tracked(object):
+    """The dirty tracking of :class:`TrackedDolphin` and :class:`TrackedList`
+
+    ``_layout`` is ``(key, pieces)``, the text of the members which are not
+    tracked merged with the tracked children in between, encoded with the
+    options ``key``. ``_fragment`` is ``(key, text)``, the whole text, ``text``
+    is ``None`` for a node encoded as a part of a small ancestor. A change of
+    the node drops both, a change below it drops only the text, of the node
+    and its ancestors.
+    """
+    __slots__ = ()
+
+    def _init(self):
+        object.__setattr__(self, '_parents', [])
+        object.__setattr__(self, '_layout', None)
+        object.__setattr__(self, '_fragment', None)
+
+    def _changed(self):
+        object.__setattr__(self, '_layout', None)
+        self._touch()
+
+    def _touch(self):
+        # the descendants of a clean node are clean, so the ancestors of a dirty node are dirty
+        if self._fragment is not None:
+            object.__setattr__(self, '_fragment', None)
+            for parent in self._parents:
+                parent._touch()
+
+    def _track(self, value):
+        """``value`` converted to a tracked node which has this node as parent"""
+        value = track(value)
+        if isinstance(value, _Tracked) and not any(parent is self for parent in value._parents):
+            value._parents.append(self)
+        return value
+
+
+class TrackedDolphin(Dolphin, _Tracked):
+    """A :class:`Dolphin` which caches its encoded text, made by :func:`track`
+
+    A change marks the object and the objects holding it dirty,
+    :func:`objson.dumps` reuses the cached text of the others.
+    """
+    __slots__ = ('_parents', '_layout', '_fragment')
+
+    def __init__(self, other=None):
+        self._init()
+        if other:
+            if isinstance(other, Dolphin):
+                other = other._mapping()
+            kv = self.__dict__
+            for key, value in other.items():
+                kv[key] = self._track(value)
+
+    def __setitem__(self, key, value):
+        key = str(key)
+        if not key.startswith('_'):
+            self.__dict__[key] = self._track(value)
+            self._changed()
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = self._track(value)
+        self._changed()
+
+    def __delattr__(self, name):
+        if name not in self.__dict__:
+            raise AttributeError(name)
+        del self.__dict__[name]
+        self._changed()
+
+    def __setstate__(self, state):
+        kv = self.__dict__
+        for key, value in state.items():
+            kv[key] = self._track(value)
+
+
+class TrackedList(list, _Tracked):
+    """A :class:`list` which caches its encoded text, see :class:`TrackedDolphin`"""
+    __slots__ = ('_parents', '_layout', '_fragment')
+
+    def __init__(self, values=()):
+        self._init()
+        list.__init__(self, [self._track(value) for value in values])
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [self._track(item) for item in value]
+        else:
+            value = self._track(value)
+        list.__setitem__(self, index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._changed()
+
+    # python 2 calls these for the simple slices
+    def __setslice__(self, i, j, values):
+        self.__setitem__(slice(i, j), values)
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(i, j))
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._changed()
+        return self
+
+    def append(self, value):
+        list.append(self, self._track(value))
+        self._changed()
+
+    def extend(self, values):
+        list.extend(self, [self._track(value) for value in values])
+        self._changed()
+
+    def insert(self, index, value):
+        list.insert(self, index, self._track(value))
+        self._changed()
+
+    def pop(self, *args):
+        value = list.pop(self, *args)
+        self._changed()
+        return value
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._changed()
+
+    def reverse(self):
+        list.reverse(self)
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._changed()
+
+
+def track(value):
+    """a copy of ``value`` which caches its encoded text for :func:`objson.dumps`
+
+    A change marks the changed object or list and the ones holding it dirty,
+    :func:`objson.dumps` encodes them again and reuses the text of the rest,
+    so re-encoding a large document after a small change costs about the
+    changed objects and the members along the path to them. The objects and
+    lists holding at most :data:`SPLIT_SIZE` members in total are encoded and
+    cached as a whole. The first :func:`objson.dumps` takes a few times longer
+    than for the untracked object.
+
+    The dicts, objects and lists assigned to a tracked object are copied into
+    tracked ones. The changes inside other values, like tuples or the instances
+    of :func:`make_dynamic_class`, are not seen, assign them again instead.
+    The text is cached for the default encoding options except ``indent``.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> body = objson.track(objson.loads('{"Image": "web", "Env": ["A=1"], "HostConfig": {"Memory": 0}}'))
+    >>> text = objson.dumps(body)
+    >>> body.HostConfig.Memory = 512
+    >>> body.Env.append('B=2')
+    >>> print objson.dumps(body)
+
+    :param value: :class:`Dolphin`, :class:`dict`, :class:`list` or a scalar
+    :return: :class:`TrackedDolphin` for the objects, :class:`TrackedList` for the lists
+    """
+    if isinstance(value, (_Tracked, FrozenDolphin)):
+        return value
+    elif isinstance(value, (Dolphin, dict)):
+        return TrackedDolphin(value)
+    elif isinstance(value, list):
+        return TrackedList(value)
+    return value
+
+
+class DolphinEncoder(json.JSONEncoder):
+    """A :class:`json.JSONEncoder` which serializes :class:`Dolphin` and the instances
+    of :func:`make_dynamic_class`
+
+    The C encoder calls :func:`object2dict` back for each object, a plain :class:`Dolphin`
+    gives its ``__dict__`` without a copy. The callback and the nesting it adds per object
+    still cost, a tree of objects dumps about 1.5 times slower than the same tree of dicts.
+
+    Dumping at the speed of dicts is out of scope: it needs an encoder in C which
+    knows :class:`Dolphin`. Turning the tree into dicts and lists in one python pass
+    before the C encoder runs is slower than the callback, the pass alone takes about
+    as long as encoding the dicts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['default'] = object2dict
+        super(DolphinEncoder, self).__init__(*args, **kwargs)
+
+
+_default_encoder = DolphinEncoder()
 
 
 def dumps(obj, *args, **kwargs):
@@ -90,14 +647,284 @@ def dumps(obj, *args, **kwargs):
     :param kwargs: Keys arguments that :py:func:`json.dumps` takes.
     :return: string
     """
-    kwargs['default'] = object2dict
+    if instrument.active:
+        start = instrument.timer()
+        text = _dumps(obj, args, kwargs)
+        elapsed = instrument.timer() - start
+        instrument.record('dumps', elapsed, encode_calls=1, encode_time=elapsed, bytes_out=len(text))
+        return text
+    if not args and not kwargs and get_backend() is json:
+        if isinstance(obj, _Tracked):
+            return _encode_tracked(obj, _default_encoder, _default_key, set())
+        return _default_encoder.encode(obj)
+    return _dumps(obj, args, kwargs)
+
+
+def _dumps(obj, args, kwargs):
+    backend = get_backend()
+    if backend is json and not args and isinstance(obj, _Tracked):
+        encoder = _encoder(dict(kwargs))
+        key = _tracked_key(encoder)
+        if key is not None:
+            return _encode_tracked(obj, encoder, key, set() if encoder.check_circular else None)
+    if backend is not json:
+        kwargs['default'] = object2dict
+        return backend.dumps(obj, *args, **kwargs)
+    if not args and not kwargs:
+        return _default_encoder.encode(obj)
+    kwargs['cls'] = DolphinEncoder
 
     return json.dumps(obj, *args, **kwargs)
 
 
+def _tracked_key(encoder):
+    """the options which the cached text of :class:`TrackedDolphin` depends on,
+    ``None`` if the text of ``encoder`` is not cached
+    """
+    if type(encoder) is not DolphinEncoder or encoder.indent is not None:
+        return None
+    return (encoder.item_separator, encoder.key_separator, encoder.sort_keys,
+            encoder.ensure_ascii, encoder.allow_nan)
+
+
+_default_key = _tracked_key(_default_encoder)
+
+
+def _layout(node, encoder):
+    """the pieces of the text of ``node``, the runs of members which are not
+    tracked are encoded at once by the C encoder, the tracked children are left in
+    """
+    if isinstance(node, list):
+        opening, closing, members, pack = '[', ']', node, list
+    else:
+        items = sorted(node.__dict__.items()) if encoder.sort_keys else node.__dict__.items()
+        # a dict keeps the order of the batch wherever the order of a dict is kept
+        opening, closing, members, pack = '{', '}', items, dict
+    pieces = [opening]
+    separator = ''
+    batch = []
+    for member in members:
+        value = member if pack is list else member[1]
+        if not isinstance(value, _Tracked):
+            batch.append(member)
+            continue
+        if batch:
+            pieces[-1] += separator + encoder.encode(pack(batch))[1:-1]
+            separator = encoder.item_separator
+            batch = []
+        if pack is list:
+            pieces[-1] += separator
+        else:
+            pieces[-1] += separator + encoder.encode(member[0]) + encoder.key_separator
+        pieces.append(value)
+        pieces.append('')
+        separator = encoder.item_separator
+    if batch:
+        pieces[-1] += separator + encoder.encode(pack(batch))[1:-1]
+    pieces[-1] += closing
+    return pieces
+
+
+def _settle(values, key, budget):
+    """count the members of the nested containers down from ``budget`` like :func:`_budget`,
+    and mark the tracked nodes met clean, their text is a part of the text of an
+    ancestor, so a change still reaches it
+    """
+    budget -= len(values)
+    for value in values:
+        if budget < 0:
+            break
+        if isinstance(value, _Tracked):
+            object.__setattr__(value, '_fragment', (key, None))
+            budget = _settle(value if isinstance(value, list) else value.__dict__.values(), key, budget)
+        elif isinstance(value, (Dolphin, dict, list, tuple)):
+            if isinstance(value, Dolphin):
+                value = object2dict(value)
+            budget = _settle(value.values() if isinstance(value, dict) else value, key, budget)
+    return budget
+
+
+def _encode_tracked(node, encoder, key, markers):
+    """the text of a tracked node, a node holding at most :data:`SPLIT_SIZE` members
+    in total is encoded at once by the C encoder, a larger one from its cached
+    layout and the text of its children
+    """
+    fragment = node._fragment
+    if fragment is not None and fragment[0] == key and fragment[1] is not None:
+        return fragment[1]
+
+    # the nodes met are marked before they are known to be small, the ones of a
+    # large node get their own text below
+    if _settle(node if isinstance(node, list) else node.__dict__.values(), key, SPLIT_SIZE) >= 0:
+        text = encoder.encode(node)
+        object.__setattr__(node, '_fragment', (key, text))
+        return text
+
+    if markers is not None:
+        if id(node) in markers:
+            raise ValueError('Circular reference detected')
+        markers.add(id(node))
+
+    layout = node._layout
+    if layout is None or layout[0] != key:
+        layout = (key, _layout(node, encoder))
+        object.__setattr__(node, '_layout', layout)
+    pieces = []
+    for piece in layout[1]:
+        if isinstance(piece, _Tracked):
+            fragment = piece._fragment
+            if fragment is not None and fragment[0] == key and fragment[1] is not None:
+                piece = fragment[1]
+            else:
+                piece = _encode_tracked(piece, encoder, key, markers)
+        pieces.append(piece)
+    text = ''.join(pieces)
+    object.__setattr__(node, '_fragment', (key, text))
+
+    if markers is not None:
+        markers.discard(id(node))
+    return text
+
+
+def _encoder(kwargs):
+    backend = get_backend()
+    if backend is json:
+        cls = kwargs.pop('cls', None)
+        if cls is None:
+            return DolphinEncoder(**kwargs) if kwargs else _default_encoder
+        kwargs.setdefault('default', object2dict)
+        return cls(**kwargs)
+    kwargs['default'] = object2dict
+    encoder_class = getattr(backend, 'JSONEncoder', None)
+    return encoder_class(**kwargs) if encoder_class is not None else None
+
+
+def _budget(values, budget):
+    """count the members of the nested containers down from ``budget``, stop when it runs out"""
+    budget -= len(values)
+    for value in values:
+        if budget < 0:
+            break
+        if isinstance(value, Dolphin):
+            value = object2dict(value)
+        if isinstance(value, dict):
+            budget = _budget(value.values(), budget)
+        elif isinstance(value, (list, tuple)):
+            budget = _budget(value, budget)
+    return budget
+
+
+def _split(obj, encoder, markers):
+    """encode ``obj`` in pieces, the runs of members which hold at most :data:`SPLIT_SIZE`
+    members in total are encoded at once by the C encoder
+    """
+    if isinstance(obj, _Tracked):
+        key = _tracked_key(encoder)
+        if key is not None:
+            yield _encode_tracked(obj, encoder, key, markers)
+            return
+    if isinstance(obj, Dolphin):
+        obj = object2dict(obj)
+    if isinstance(obj, (list, tuple)):
+        values = obj
+    elif isinstance(obj, dict) and all(isinstance(key, _string_types) for key in obj):
+        values = obj.values()
+    else:
+        values = None
+    if values is None or _budget(values, SPLIT_SIZE) >= 0:
+        yield encoder.encode(obj)
+        return
+
+    if markers is not None:
+        if id(obj) in markers:
+            raise ValueError('Circular reference detected')
+        markers.add(id(obj))
+
+    if values is obj:
+        opening, closing, members, pack = '[', ']', obj, list
+    else:
+        items = sorted(obj.items()) if encoder.sort_keys else obj.items()
+        opening, closing, members, pack = '{', '}', items, collections.OrderedDict
+    yield opening
+    separator = ''
+    batch = []
+    room = SPLIT_SIZE
+    for member in members:
+        cost = SPLIT_SIZE - _budget([member if pack is list else member[1]], SPLIT_SIZE)
+        if cost > room and batch:
+            yield separator + encoder.encode(pack(batch))[1:-1]
+            separator = encoder.item_separator
+            batch = []
+            room = SPLIT_SIZE
+        if cost <= SPLIT_SIZE:
+            batch.append(member)
+            room -= cost
+            continue
+        if pack is list:
+            yield separator
+        else:
+            yield separator + encoder.encode(member[0]) + encoder.key_separator
+            member = member[1]
+        for chunk in _split(member, encoder, markers):
+            yield chunk
+        separator = encoder.item_separator
+    if batch:
+        yield separator + encoder.encode(pack(batch))[1:-1]
+    yield closing
+
+    if markers is not None:
+        markers.discard(id(obj))
+
+
+def _iterencode(obj, kwargs):
+    encoder = _encoder(kwargs)
+    if encoder is None:
+        return iter([get_backend().dumps(obj, **kwargs)])
+    elif encoder.indent is not None:
+        return encoder.iterencode(obj)
+    return _split(obj, encoder, set() if encoder.check_circular else None)
+
+
+def iterdumps(obj, buffer_size=DEFAULT_BUFFER_SIZE, **kwargs):
+    """Serialize a object to string pieces, for example the body of a chunked upload
+
+    The large arrays and objects are encoded member by member, so the memory
+    used is bounded by the largest small member instead of the whole document.
+    The pieces are merged up to about ``buffer_size``.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> obj = objson.loads('[{"name": "wendy"}, {"name": "benjamin"}]')
+    >>> text = ''.join(objson.iterdumps(obj))
+
+    :param obj: a object which need to dump
+    :param buffer_size: :class:`int`, the size of a piece
+    :param kwargs: Keys arguments that :py:func:`json.dumps` takes.
+    :return: a generator of string
+    """
+    pieces = []
+    size = 0
+    for chunk in _iterencode(obj, kwargs):
+        pieces.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield ''.join(pieces)
+            pieces = []
+            size = 0
+    if pieces:
+        yield ''.join(pieces)
+
+
 def dump(obj, fp, *args, **kwargs):
     """Serialize a object to a file object.
 
+    The text is written in pieces of about ``buffer_size``, instead of one
+    ``write`` per token like :func:`json.dump`, see :func:`iterdumps`.
+    Pass ``compression='gzip'`` or ``'zlib'`` to compress the pieces into a
+    binary file as they are written, ``'auto'`` picks by the extension of
+    ``fp.name``, ``.gz`` or ``.zz``.
+
     Basic Usage:
 
     >>> import simplekit.objson
@@ -110,12 +937,43 @@ def dump(obj, fp, *args, **kwargs):
     :param obj: a object which need to dump
     :param fp: a instance of file object
     :param args: Optional arguments that :func:`json.dump` takes.
-    :param kwargs: Keys arguments that :func:`json.dump` takes.
+    :param kwargs: Keys arguments that :func:`json.dump` takes, and ``buffer_size``, ``compression``.
     :return: None
     """
-    kwargs['default'] = object2dict
+    if instrument.active:
+        start = instrument.timer()
+        size = _dump(obj, fp, args, kwargs)
+        elapsed = instrument.timer() - start
+        instrument.record('dump', elapsed, encode_calls=1, encode_time=elapsed, bytes_out=size)
+    else:
+        _dump(obj, fp, args, kwargs)
+
+
+def _dump(obj, fp, args, kwargs):
+    """write ``obj`` to ``fp``, the size written is returned if it is known"""
+    compression = kwargs.pop('compression', None)
+    if compression is not None:
+        compressor = _compression.writer(fp, compression)
+        if compressor is not None:
+            size = _dump(obj, compressor, args, kwargs)
+            compressor.close()
+            return size
+
+    buffer_size = kwargs.pop('buffer_size', DEFAULT_BUFFER_SIZE)
+    if args:
+        backend = get_backend()
+        kwargs['default'] = object2dict
+        if backend is json:
+            kwargs['cls'] = DolphinEncoder
+        backend.dump(obj, fp, *args, **kwargs)
+        return 0
 
-    json.dump(obj, fp, *args, **kwargs)
+    size = 0
+    write = fp.write
+    for piece in iterdumps(obj, buffer_size, **kwargs):
+        write(piece)
+        size += len(piece)
+    return size
 
 
 def _load(fn):
@@ -133,19 +991,165 @@ def _load(fn):
         >>> obj = objson.loads(text)
         >>> assert obj.Name == 'wendy'
 
-        :param src: string or file object
+        Pass ``lazy=True`` to defer wrapping the nested objects until they are
+        accessed, it's cheaper when only a few properties of a large document are used.
+
+        Pass ``intern=True`` to share the repeated keys and short strings of
+        the document, and ``share=True`` to also share the identical sub objects
+        made up of scalars, see :func:`make_pairs_hook`.
+
+        Pass ``fields`` to keep only some properties, no object is built for the
+        others. It is a list of names, or a dict of name to the fields of its
+        value (``None`` keeps the whole value), the arrays are walked through:
+
+        >>> containers = objson.loads(text, fields={'Id': None, 'status': ['Running']})
+
+        Pass ``compression`` to ``load`` to read a gzip or zlib compressed binary
+        file, ``'auto'`` detects it by the magic bytes. The file is decompressed in
+        chunks and the top level members are decoded one at a time, like
+        :func:`objson.load_path`, so neither text is held whole:
+
+        >>> with open('snapshot.json.gz', 'rb') as fp:
+        ...     snapshot = objson.load(fp, compression='auto')
+
+        ``loads`` also takes :class:`bytes`, :class:`bytearray` or :class:`memoryview`
+        of UTF-8, UTF-16 or UTF-32 text, the encoding is detected from the BOM or
+        the zero bytes of the first characters like :rfc:`4627`.
+
+        :param src: string, bytes or file object
         :param args: Optional arguments that :func:`json.load` takes.
-        :param kwargs: Keys arguments that :func:`json.loads` takes.
+        :param kwargs: Keys arguments that :func:`json.loads` takes, and ``lazy``,
+            ``intern``, ``share``, ``fields``, ``compression`` of ``load``.
         :return: :class:`object` or :class:`list`
+        :raise TypeError: ``compression`` other than ``None`` passed to ``loads``
         """
+        if kwargs.get('compression') is not None:
+            if fn.__name__ == 'loads':
+                raise TypeError('loads takes no compression, pass the compressed file to load')
+            _compression.check(kwargs['compression'])
+        if instrument.active:
+            return _timed(fn.__name__, src, args, kwargs)
         try:
-            kwargs['object_hook'] = object_hook
-            return fn(src, *args, **kwargs)
+            return _decode(fn.__name__, src, args, kwargs)
         except ValueError:
             return None
 
     return tmp
 
 
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'),
+         (codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+         (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+# the first bytes of the BOMs, a python 2 :class:`str` starts otherwise is UTF-8
+_BOM_STARTS = (b'\xef', b'\xfe', b'\xff')
+
+
+def _detect_encoding(head):
+    """the encoding of json text from its first 4 bytes, the same as :func:`json.detect_encoding`
+    of python 3
+
+    :param head: :class:`bytearray`
+    :return: :class:`str`
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if len(head) >= 4:
+        if not head[0]:
+            return 'utf-16-be' if head[1] else 'utf-32-be'
+        if not head[1]:
+            return 'utf-16-le' if head[2] or head[3] else 'utf-32-le'
+    elif len(head) == 2:
+        if not head[0]:
+            return 'utf-16-be'
+        if not head[1]:
+            return 'utf-16-le'
+    return 'utf-8'
+
+
+def _text(src):
+    """the json text of binary ``src``, it is decoded straight from the buffer in one pass
+
+    The UTF-8 :class:`str` of python 2 is returned as is, the decoder reads it
+    without a copy.
+    """
+    if not isinstance(src, (bytes, bytearray, memoryview)):
+        return src
+    head = src[:4]
+    if isinstance(head, _string_types) and b'\x00' not in head and head[:1] not in _BOM_STARTS:
+        return src
+    encoding = _detect_encoding(bytearray(head.tobytes() if isinstance(head, memoryview) else head))
+    if encoding == 'utf-8' and isinstance(src, _string_types):
+        return src
+    return codecs.decode(src, encoding)
+
+
+def _decode(name, src, args, kwargs, counted=None):
+    """decode ``src`` by the function ``name`` of the backend
+
+    :param counted: a function wraps the object hook to count the objects, used by :func:`_timed`
+    """
+    lazy = kwargs.pop('lazy', False)
+    interned = kwargs.pop('intern', False)
+    share = kwargs.pop('share', False)
+    fields = kwargs.pop('fields', None)
+    compression = kwargs.pop('compression', None)
+    loader = getattr(get_backend(), name)
+    if name == 'loads':
+        src = _text(src)
+    elif compression is not None:
+        # stream imports this module
+        from .stream import _load_stream
+        src = _compression.reader(src, compression)
+        loader = _load_stream
+    if fields is not None:
+        if interned or share:
+            kwargs['object_pairs_hook'] = make_pairs_hook(None, share)
+        result = loader(src, *args, **kwargs)
+        if lazy:
+            return _project(result, _projection(fields), _lazy, LazyDolphin)
+        return _project(result, _projection(fields), _rebuild, _adopt)
+    if interned or share:
+        kwargs['object_pairs_hook'] = make_pairs_hook(None if lazy else Dolphin, share)
+    elif not lazy:
+        kwargs['object_hook'] = object_hook
+    if counted is not None:
+        for hook in ('object_hook', 'object_pairs_hook'):
+            if hook in kwargs:
+                kwargs[hook] = counted(kwargs[hook])
+    result = loader(src, *args, **kwargs)
+    return _lazy(result) if lazy else result
+
+
+def _size(src):
+    if isinstance(src, memoryview):
+        return len(src) * src.itemsize
+    return len(src) if isinstance(src, (_string_types, bytes, bytearray)) else 0
+
+
+def _timed(name, src, args, kwargs):
+    objects = [0]
+
+    def counted(hook):
+        def wrapper(obj):
+            objects[0] += 1
+            return hook(obj)
+
+        return wrapper
+
+    errors = 0
+    start = instrument.timer()
+    try:
+        result = _decode(name, src, args, kwargs, counted)
+    except ValueError:
+        result = None
+        errors = 1
+    elapsed = instrument.timer() - start
+    instrument.record(name, elapsed, decode_calls=1, decode_time=elapsed, objects=objects[0], errors=errors,
+                      bytes_in=_size(src))
+    return result
+
+
 load = _load(json.load)
 loads = _load(json.loads)
@@ -1,10 +1,40 @@
 import re
+import weakref
+from functools import partial
 from keyword import iskeyword as _iskeyword
+from operator import itemgetter
+
+try:
+    import copyreg
+except ImportError:
+    import copy_reg as copyreg
 
 __author__ = 'benjamin.c.yan@newegg.com'
 
+try:
+    _string_types = basestring
+except NameError:
+    _string_types = str
+
 _re_encode = re.compile('[^a-zA-z0-9_]', re.MULTILINE)
 
+# the classes by their shape ``(typename, fields, slots)``, used to rebuild the pickled instances
+_shapes = weakref.WeakValueDictionary()
+
+# the caches which give the class of a pickled shape instead of creating another one,
+# the prefix of the type name -> a function takes the field names, see :mod:`dolphin`
+_caches = {}
+
+# python 2 takes at most 255 arguments in a function definition
+_MAX_ARGUMENTS = 255
+
+_factory_template = """\
+def factory(%(arguments)s):
+    obj = new(cls)
+    obj.__dict__ = {%(items)s}
+    return obj
+"""
+
 
 def _item_setter(key):
     def _setter(item, value):
@@ -35,6 +65,16 @@ def _property(name):
     return property(_item_getter(name), _item_setter(name))
 
 
+def _dynamic__getattr(names):
+    def __getattr__(self, name):
+        # a declared field which is not set yet
+        if name in names:
+            return None
+        raise AttributeError(name)
+
+    return __getattr__
+
+
 def _encode_property_name(name):
     if _iskeyword(name) or name[0].isdigit():
         return 'm' + name
@@ -43,7 +83,210 @@ def _encode_property_name(name):
     return name
 
 
-def make_dynamic_class(typename, field_names):
+def _slots__init(self, kv=None):
+    if kv:
+        for key, value in kv.items():
+            self[key] = value
+
+
+def _slots__getitem(self, key):
+    slot = self.__fields__.get(key)
+    if slot is not None:
+        return getattr(self, slot, None)
+
+
+def _slots__setitem(self, key, value):
+    slot = self.__fields__.get(key)
+    if slot is None:
+        raise KeyError(key)
+    setattr(self, slot, value)
+
+
+def _slot_is_set(member, obj):
+    # ``hasattr`` is always true for the declared fields, see ``__getattr__``
+    try:
+        member.__get__(obj)
+    except AttributeError:
+        return False
+    return True
+
+
+def _slots__iter(self):
+    cls = type(self)
+    return (key for key, slot in self.__fields__.items() if _slot_is_set(getattr(cls, slot), self))
+
+
+def _dynamic__reduce(self):
+    # only the first instance of the class comes here, the others go to the reducer
+    return _register(type(self))(self)
+
+
+class _Factory(partial):
+    """A function builds an instance of a dict mode class from the field values, pickled
+    by the shape of the class, so the class is looked up once per pickle, not per instance
+    """
+
+    def __reduce__(self):
+        return _factory, (self.shape,)
+
+
+def _make_factory(dynamic_class, field_names):
+    """the :class:`_Factory` of ``dynamic_class`` taking the values of ``field_names`` in order,
+    generated like :func:`collections.namedtuple`, the dict is built in one expression
+    """
+    if len(field_names) > _MAX_ARGUMENTS:
+        def factory(*values):
+            obj = object.__new__(dynamic_class)
+            obj.__dict__ = dict(zip(field_names, values))
+            return obj
+    else:
+        arguments = ', '.join('_%d' % i for i in range(len(field_names)))
+        items = ', '.join('%r: _%d' % (name, i) for i, name in enumerate(field_names))
+        namespace = {'new': object.__new__, 'cls': dynamic_class}
+        exec(_factory_template % {'arguments': arguments, 'items': items}, namespace)
+        factory = namespace['factory']
+    factory = _Factory(factory)
+    factory.shape = (dynamic_class.__shape__[0], field_names, False)
+    return factory
+
+
+def _factory(shape):
+    """the factory of the pickled ``shape``, the values are in the order of its fields"""
+    dynamic_class = _restore_class(shape)
+    if dynamic_class.__shape__[1] == shape[1]:
+        return _register(dynamic_class).factory
+    # a shared class of :data:`_caches` holds the fields in its own order
+    return _make_factory(dynamic_class, shape[1])
+
+
+def _register(dynamic_class):
+    """register the reducer of ``dynamic_class`` in :mod:`copyreg`, the instances are pickled
+    as its factory and a tuple of the field values without calling back any method
+
+    :return: the reducer
+    """
+    reducer = copyreg.dispatch_table.get(dynamic_class)
+    if reducer is not None:
+        return reducer
+    shape = dynamic_class.__shape__
+    field_names = shape[1]
+    factory = _make_factory(dynamic_class, field_names)
+    count = len(field_names)
+    if count > 1:
+        values = itemgetter(*field_names)
+    else:
+        values = lambda kv: tuple(kv[key] for key in field_names)
+
+    def reducer(obj):
+        kv = obj.__dict__
+        if len(kv) == count:
+            try:
+                return factory, values(kv)
+            except KeyError:
+                pass
+        # an instance lacks a field or holds the other ones
+        return _restore, (shape,), kv
+
+    reducer.factory = factory
+    copyreg.pickle(dynamic_class, reducer)
+    return reducer
+
+
+def _unregister(dynamic_class):
+    """drop the reducer of ``dynamic_class``, which :mod:`copyreg` would keep forever"""
+    copyreg.dispatch_table.pop(dynamic_class, None)
+
+
+def _dynamic__setstate(self, state):
+    if isinstance(state, tuple):
+        state = zip(self.__shape__[1], state)
+    self.__dict__.update(state)
+
+
+def _slots__reduce(self):
+    return _restore, (self.__shape__,), _values(dict((key, self[key]) for key in self), self.__shape__[1])
+
+
+def _slots__setstate(self, state):
+    items = zip(self.__shape__[1], state) if isinstance(state, tuple) else state.items()
+    for key, value in items:
+        setattr(self, self.__fields__[key], value)
+
+
+def _unique(field_names):
+    seen = set()
+    return tuple([name for name in field_names if not (name in seen or seen.add(name))])
+
+
+def _values(kv, fields):
+    """the values in field order when ``kv`` holds exactly the fields, pickle stores
+    the field names once per class instead of once per instance
+    """
+    if len(kv) == len(fields):
+        try:
+            return tuple(map(kv.__getitem__, fields))
+        except KeyError:
+            pass
+    return kv
+
+
+def _restore_class(shape):
+    """the class of ``shape``, it is taken from :data:`_caches` or created if this
+    process has not got it yet
+    """
+    dynamic_class = _shapes.get(shape)
+    if dynamic_class is None:
+        typename, field_names, slots = shape
+        cache = None if slots else _caches.get(typename.rsplit('_', 1)[0])
+        if cache is not None:
+            dynamic_class = cache(field_names)
+        else:
+            dynamic_class = make_dynamic_class(typename, field_names, slots)
+    return dynamic_class
+
+
+def _restore(shape):
+    """create an empty instance of the class of ``shape``"""
+    dynamic_class = _restore_class(shape)
+    return dynamic_class.__new__(dynamic_class)
+
+
+def _slots_attributes(field_names):
+    """map each field to a slot, the field which is an identifier owns its name, the
+    escaped name of the others is the slot if it is not taken, like the dict mode
+    """
+    field_names = _unique(field_names)
+    taken = set(name for name in field_names if _encode_property_name(name) == name)
+    fields = {}
+    slots = []
+    for name in field_names:
+        slot = _encode_property_name(name)
+        if slot != name and slot in taken:
+            index = len(slots)
+            while '_slot_%d' % index in taken:
+                index += 1
+            slot = '_slot_%d' % index
+        taken.add(slot)
+        fields[name] = slot
+        slots.append(slot)
+
+    attr = dict()
+    attr['__slots__'] = tuple(slots)
+    attr['__fields__'] = fields
+    attr['__init__'] = _slots__init
+    attr['__getattr__'] = _dynamic__getattr(frozenset(slots))
+    attr['__getitem__'] = _slots__getitem
+    attr['__setitem__'] = _slots__setitem
+    attr['__iter__'] = _slots__iter
+    attr['__reduce__'] = _slots__reduce
+    attr['__setstate__'] = _slots__setstate
+    attr['__repr__'] = lambda self: "{%s}" % (', '.join([
+                                                            "%s=%r" % (key, self[key]) for key in sorted(self)
+                                                            ]))
+    return attr
+
+
+def make_dynamic_class(typename, field_names, slots=False):
     """a factory function to create type dynamically
 
     The factory function is used by :func:`objson.load` and :func:`objson.loads`.
@@ -76,7 +319,18 @@ def make_dynamic_class(typename, field_names):
                 text = ', '.join(["%s=%r" % (key, self[key]) for key in keys])
                 return '{%s}' % text
 
-            name=_property('name')
+            def __getattr__(self, name):
+                if name in ('name', 'from_cookie'):
+                    return None
+                raise AttributeError(name)
+
+            from_cookie=_property('from-cookie')
+
+    The fields which are valid identifiers are read from the instance ``__dict__``
+    directly, only the escaped fields go through a property.
+
+    The instances can be pickled, the class is rebuilt by name and fields on
+    the other side, so they can be sent to other processes or cached on disk.
 
     Basic Usage ::
 
@@ -89,25 +343,42 @@ def make_dynamic_class(typename, field_names):
     :param typename: dynamic class's name
     :param field_names: a string :class:`list` and a field name string which separated by comma,
         ``['name', 'sex']`` or ``"name,sex"``
+    :param slots: :class:`bool`, store the fields in ``__slots__`` instead of a per instance
+        ``__dict__``, the instances are much smaller, but only the declared fields can be set
 
     :return: a class type
     """
-    if isinstance(field_names, basestring):
+    if isinstance(field_names, _string_types):
         field_names = field_names.replace(",", " ").split()
-    field_names = map(str, field_names)
+    field_names = [str(name) for name in field_names]
+    shape = (typename, _unique(field_names), bool(slots))
+
+    if slots:
+        attr = _slots_attributes(field_names)
+        attr['__doc__'] = typename
+        attr['__identifier__'] = "dolphin"
+        attr['__shape__'] = shape
+        dynamic_class = _shapes[shape] = type(typename, (object,), attr)
+        return dynamic_class
 
-    safe_fields_names = map(_encode_property_name, field_names)
+    safe_fields_names = [_encode_property_name(name) for name in field_names]
 
-    attr = dict((safe_name, _property(name)) for name, safe_name in zip(field_names, safe_fields_names))
+    attr = dict((safe_name, _property(name)) for name, safe_name in zip(field_names, safe_fields_names)
+                if safe_name != name and safe_name not in field_names)
     attr['__doc__'] = typename
     attr['__identifier__'] = "dolphin"
     attr['__init__'] = _dynamic__init
+    attr['__getattr__'] = _dynamic__getattr(frozenset(safe_fields_names))
     attr['__getitem__'] = lambda self, key: self.__dict__.get(key)
     attr['__setitem__'] = _dynamic__setitem
     attr['__iter__'] = lambda self: iter(self.__dict__)
+    attr['__reduce__'] = _dynamic__reduce
+    attr['__setstate__'] = _dynamic__setstate
+    attr['__shape__'] = shape
     attr['__repr__'] = lambda self: "{%s}" % (', '.join([
                                                             "%s=%r" % (key, self[key]) for key in
                                                             sorted(self.__dict__.keys())
                                                             ]))
 
-    return type(typename, (object,), attr)
+    dynamic_class = _shapes[shape] = type(typename, (object,), attr)
+    return dynamic_class
@@ -0,0 +1,112 @@
+"""
+Opt-in counters and timing of the objson calls
+"""
+import threading
+import timeit
+
+__author__ = 'benjamin.c.yan'
+
+DEFAULT_SLOW_THRESHOLD = 0.1
+
+FIELDS = ('decode_calls', 'encode_calls', 'bytes_in', 'bytes_out', 'objects', 'shape_classes',
+          'decode_time', 'encode_time', 'errors')
+
+timer = timeit.default_timer
+
+# checked by every instrumented call, the counters are touched only when it's true
+active = False
+
+_enabled = False
+_slow_hook = None
+_slow_threshold = DEFAULT_SLOW_THRESHOLD
+_lock = threading.Lock()
+_counters = dict.fromkeys(FIELDS, 0)
+
+
+def _update():
+    global active
+    active = _enabled or _slow_hook is not None
+
+
+def enable_stats(enabled=True):
+    """turn the counters of :func:`stats` on or off, they are off by default
+
+    :param enabled: :class:`bool`
+    """
+    global _enabled
+    _enabled = bool(enabled)
+    _update()
+
+
+def set_slow_hook(hook, threshold=DEFAULT_SLOW_THRESHOLD):
+    """call ``hook`` after a call which takes at least ``threshold`` seconds
+
+    Basic Usage:
+
+    >>> import logging
+    >>> from simplekit import objson
+    >>> def log_slow(name, seconds, size):
+    ...     logging.warning('objson.%s took %.3fs for %d bytes', name, seconds, size)
+    >>> objson.set_slow_hook(log_slow, threshold=0.05)
+
+    :param hook: callable takes the name of call, the seconds and the size of text,
+        ``None`` removes the hook
+    :param threshold: :class:`float`, seconds
+    """
+    global _slow_hook, _slow_threshold
+    _slow_hook = hook
+    _slow_threshold = threshold
+    _update()
+
+
+def stats():
+    """the counters since the last :func:`reset_stats`
+
+    ``decode_calls`` and ``encode_calls`` count :func:`objson.loads`, :func:`objson.load`,
+    :func:`objson.dumps` and :func:`objson.dump`, ``bytes_in`` the decoded text (file
+    objects are not measured) and ``bytes_out`` the encoded text. ``objects`` counts
+    the objects built while decoding, ``shape_classes`` the classes created by
+    :func:`dolphin.object_hook` and ``errors`` the invalid documents for which ``None``
+    was returned. The times are in seconds.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> objson.enable_stats()
+    >>> obj = objson.loads('{"name": "wendy"}')
+    >>> print objson.stats()['decode_calls']
+
+    :return: :class:`dict`
+    """
+    with _lock:
+        result = dict(_counters)
+    result['enabled'] = _enabled
+    return result
+
+
+def reset_stats():
+    """set all the counters of :func:`stats` to zero"""
+    with _lock:
+        _counters.update(dict.fromkeys(FIELDS, 0))
+
+
+def record(name, elapsed, **counts):
+    """add a call to the counters, and report it to the slow hook if it is slow
+
+    :param name: :class:`str`, ``'loads'``, ``'load'``, ``'dumps'`` or ``'dump'``
+    :param elapsed: :class:`float`, seconds
+    :param counts: the increments of :data:`FIELDS`
+    """
+    if _enabled:
+        with _lock:
+            for field, value in counts.items():
+                _counters[field] += value
+    hook = _slow_hook
+    if hook is not None and elapsed >= _slow_threshold:
+        hook(name, elapsed, counts.get('bytes_in') or counts.get('bytes_out') or 0)
+
+
+def count(field, value=1):
+    if _enabled:
+        with _lock:
+            _counters[field] += value
@@ -0,0 +1,70 @@
+"""
+Decode scoped interning of the repeated strings and sub objects
+"""
+
+__author__ = 'benjamin.c.yan'
+
+try:
+    _string_types = (str, unicode)
+    _scalar_types = (int, long, float, bool, type(None))
+except NameError:
+    _string_types = (str,)
+    _scalar_types = (int, float, bool, type(None))
+
+# the longer strings are rarely repeated, they are not worth a table lookup
+DEFAULT_MAX_LENGTH = 64
+
+_node = object()
+
+
+def make_pairs_hook(factory=None, share=False, max_length=DEFAULT_MAX_LENGTH):
+    """create an ``object_pairs_hook`` which interns keys and short strings
+
+    The table lives as long as the hook, so create one hook per decode.
+
+    With ``share``, the objects whose values are all scalars or shared objects
+    are hash-consed: the identical ones are decoded to the very same instance.
+    Changing a shared instance changes it everywhere it appears.
+
+    :param factory: callable, builds the object from a :class:`dict`, ``None`` keeps the :class:`dict`
+    :param share: :class:`bool`, share the identical sub objects
+    :param max_length: :class:`int`, the longest string to intern
+    :return: a function takes the list of ``(key, value)`` pairs
+    """
+    strings = {}
+    subtrees = {}
+    shared = set()
+
+    def hook(pairs):
+        members = []
+        signature = [] if share else None
+        for key, value in pairs:
+            key = strings.setdefault(key, key)
+            kind = type(value)
+            if kind in _string_types:
+                if len(value) <= max_length:
+                    value = strings.setdefault(value, value)
+                if signature is not None:
+                    signature.append((key, value))
+            elif signature is not None:
+                if kind in _scalar_types:
+                    signature.append((key, kind, value))
+                elif id(value) in shared:
+                    signature.append((key, _node, id(value)))
+                else:
+                    signature = None
+            members.append((key, value))
+
+        obj = dict(members)
+        if factory is not None:
+            obj = factory(obj)
+        if signature is not None:
+            signature = tuple(signature)
+            canonical = subtrees.get(signature)
+            if canonical is not None:
+                return canonical
+            subtrees[signature] = obj
+            shared.add(id(obj))
+        return obj
+
+    return hook
@@ -0,0 +1,82 @@
+"""
+Decode many independent json texts in a process pool
+"""
+import importlib
+import marshal
+import multiprocessing
+import types
+
+from .backend import get_backend
+from .dolphin2 import _lazy, _rebuild
+
+__author__ = 'benjamin.c.yan'
+
+# the total length of texts below which the pool costs more than it saves
+PARALLEL_THRESHOLD = 1 << 20
+
+# the chunks per worker when ``chunksize`` is not given, more chunks balance the load better
+CHUNKS_PER_WORKER = 4
+
+
+def _decode(loads, texts):
+    results = []
+    for text in texts:
+        try:
+            results.append(loads(text))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def _decode_chunk(task):
+    """runs in the worker, the plain results go back as one :mod:`marshal` blob,
+    which is much cheaper to build and read than a pickle of the objects
+    """
+    backend, texts = task
+    return marshal.dumps(_decode(importlib.import_module(backend).loads, texts))
+
+
+def loads_many(texts, workers=None, chunksize=None, lazy=False):
+    """Deserialize many json strings, in a process pool when they are large enough
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> objs = objson.loads_many(['{"Name": "wendy"}', '{"Name": "benjamin"}'], workers=2)
+    >>> assert objs[1].Name == 'benjamin'
+
+    The workers decode to plain values and the parent wraps them, so the
+    results are the same as :func:`objson.loads`. The texts whose total length
+    is below :data:`PARALLEL_THRESHOLD` are decoded in process. The workers
+    import the backend by module name, a backend which is not a module is used
+    in process only.
+
+    :param texts: iterable of string
+    :param workers: :class:`int`, the number of processes, default is the number of cpus
+    :param chunksize: :class:`int`, the number of texts sent to a worker at once
+    :param lazy: :class:`bool`, wrap the nested objects on access, see :func:`objson.loads`
+    :return: :class:`list`, in the order of ``texts``, ``None`` for an invalid text
+    """
+    texts = list(texts)
+    backend = get_backend()
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(texts))
+
+    if (workers <= 1 or not isinstance(backend, types.ModuleType) or
+            sum(len(text) for text in texts) < PARALLEL_THRESHOLD):
+        results = _decode(backend.loads, texts)
+    else:
+        if chunksize is None:
+            chunksize = -(-len(texts) // (workers * CHUNKS_PER_WORKER))
+        tasks = [(backend.__name__, texts[i:i + chunksize]) for i in range(0, len(texts), chunksize)]
+        pool = multiprocessing.Pool(workers)
+        try:
+            blobs = pool.map(_decode_chunk, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+        results = [result for blob in blobs for result in marshal.loads(blob)]
+
+    wrap = _lazy if lazy else _rebuild
+    return [wrap(result) for result in results]
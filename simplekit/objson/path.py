@@ -0,0 +1,191 @@
+"""
+Compiled path queries over decoded objects
+"""
+import re
+from keyword import iskeyword
+
+from .columnar import _column
+
+__author__ = 'benjamin.c.yan'
+
+_re_token = re.compile(r'([^.\[\]]+)|\[(\*|-?\d+)\]|(\.)')
+
+_re_identifier = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# the names which are not keywords of python 2, but can't follow a dot
+_CONSTANTS = ('None', 'True', 'False')
+
+_EACH = object()
+
+# the errors of a step which meets a missing property, index or a value of other type
+_MISSING = (AttributeError, IndexError, KeyError, TypeError)
+
+
+def _parse(path):
+    """split ``path`` into steps, the adjacent names are merged into one dotted name
+
+    :return: :class:`list` of ``(kind, value)``
+    """
+    steps = []
+    position = 0
+    dotted = False
+    for match in _re_token.finditer(path):
+        if match.start() != position:
+            break
+        name, index, dot = match.groups()
+        if dot:
+            if dotted or not steps:
+                break
+            dotted = True
+            position = match.end()
+            continue
+        if name is not None:
+            if steps and steps[-1][0] == 'name' and dotted:
+                steps[-1] = ('name', steps[-1][1] + '.' + name)
+            elif steps and not dotted:
+                break
+            else:
+                steps.append(('name', name))
+        elif dotted:
+            break
+        elif index == '*':
+            steps.append(('each', _EACH))
+        else:
+            steps.append(('index', int(index)))
+        dotted = False
+        position = match.end()
+    if not path or position != len(path) or dotted:
+        raise ValueError('invalid path: %r' % path)
+    return steps
+
+
+def _expression(steps, variable):
+    """the python expression which applies the steps which are not wildcards to ``variable``"""
+    source = variable
+    for kind, value in steps:
+        if kind == 'index':
+            source = '%s[%d]' % (source, value)
+            continue
+        for name in value.split('.'):
+            if _re_identifier.match(name) and not iskeyword(name) and name not in _CONSTANTS:
+                source = '%s.%s' % (source, name)
+            else:
+                source = 'getattr(%s, %r)' % (source, name)
+    return source
+
+
+def _source(steps, variable, depth=0):
+    """the python expression of the whole path, a wildcard is a list comprehension"""
+    for i, (kind, _) in enumerate(steps):
+        if kind == 'each':
+            item = 'item%d' % depth
+            return '[%s for %s in %s]' % (_source(steps[i + 1:], item, depth + 1), item,
+                                          _expression(steps[:i], variable))
+    return _expression(steps, variable)
+
+
+def _compile(steps):
+    """a function runs the path in one expression, it raises on a missing step
+
+    ``'[*].Names[0]'`` becomes ``lambda value: [item0.Names[0] for item0 in value]``,
+    no python loop runs per step.
+    """
+    return eval('lambda value: %s' % _source(steps, 'value'), {})
+
+
+def _safe(extract, fallback=None):
+    """wrap ``extract`` to give ``None`` on a missing step, ``fallback`` retries
+    the value when a wildcard meets a missing step in some element
+    """
+
+    def safe(value):
+        try:
+            return extract(value)
+        except _MISSING:
+            return fallback(value) if fallback is not None else None
+
+    return safe
+
+
+def _build(steps):
+    """compile the steps
+
+    :return: ``(extract, safe)``, ``extract`` runs the whole path in one generated
+        function and raises on a missing step, ``safe`` gives ``None`` instead
+    """
+    extract = _compile(steps)
+    for i, (kind, _) in enumerate(steps):
+        if kind == 'each':
+            break
+    else:
+        return extract, _safe(extract)
+
+    get_safe = _safe(_compile(steps[:i])) if i else None
+    rest_safe = _build(steps[i + 1:])[1]
+
+    def slow(value):
+        if get_safe is not None:
+            value = get_safe(value)
+        if value is None:
+            return None
+        return [rest_safe(item) for item in value]
+
+    return extract, _safe(extract, slow)
+
+
+class Path(object):
+    """A path compiled by :func:`compile_path`
+
+    :param path: :class:`str`, the path
+    """
+
+    def __init__(self, path):
+        self.path = path
+        steps = _parse(path)
+        self._extract, self._safe = _build(steps)
+        # the path over every object in one list comprehension
+        self._many = _compile([('each', _EACH)] + steps)
+
+    def __call__(self, obj):
+        """the value at the path of ``obj``, ``None`` if a step is missing"""
+        return self._safe(obj)
+
+    def many(self, objs, column=False):
+        """the values at the path of each object
+
+        :param objs: iterable of objects
+        :param column: :class:`bool`, return the numbers as :class:`array.array` like
+            the columns of :func:`objson.loads_columnar`
+        :return: :class:`list`
+        """
+        objs = objs if isinstance(objs, list) else list(objs)
+        try:
+            values = self._many(objs)
+        except _MISSING:
+            values = list(map(self._safe, objs))
+        return _column(values) if column else values
+
+    def __repr__(self):
+        return 'Path(%r)' % self.path
+
+
+def compile_path(path):
+    """compile a path into a fast extractor
+
+    A path is made of property names separated by ``.``, ``[n]`` takes the
+    element of a list and ``[*]`` applies the rest of the path to every element.
+    The path is compiled into a single function like the hand written attribute
+    chain, ``'[*].Names[0]'`` runs as ``[item.Names[0] for item in value]``.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> containers = objson.loads('[{"Names": ["/web"], "status": {"Running": true}}]')
+    >>> assert objson.compile_path('[*].Names[0]')(containers) == ['/web']
+    >>> running = objson.compile_path('status.Running')
+    >>> assert running.many(containers) == [True]
+
+    :param path: :class:`str`, like ``'status.Running'`` or ``'[*].Names[0]'``
+    :return: :class:`Path`
+    """
+    return Path(path)
@@ -0,0 +1,199 @@
+"""
+Decoders compiled from a known schema
+"""
+from .backend import get_backend
+from .dolphin2 import _lazy
+from .dynamic_class import make_dynamic_class
+
+__author__ = 'benjamin.c.yan'
+
+try:
+    _string_types = basestring
+    _integer_types = (int, long)
+except NameError:
+    _string_types = str
+    _integer_types = (int,)
+
+_number_types = _integer_types + (float,)
+
+_nothing = ()
+
+_booleans = {'true': True, 'false': False}
+
+
+def _is_number(value):
+    return isinstance(value, _number_types) and not isinstance(value, bool)
+
+
+def _to_bool(value):
+    if isinstance(value, _string_types) and value.lower() in _booleans:
+        return _booleans[value.lower()]
+    raise ValueError('expecting boolean, got %r' % (value,))
+
+
+def _to_int(value):
+    if isinstance(value, float) and value.is_integer() or isinstance(value, _string_types):
+        return int(value)
+    raise ValueError('expecting integer, got %r' % (value,))
+
+
+def _to_float(value):
+    if _is_number(value) or isinstance(value, _string_types):
+        return float(value)
+    raise ValueError('expecting number, got %r' % (value,))
+
+
+def _to_str(value):
+    if _is_number(value):
+        return str(value)
+    raise ValueError('expecting string, got %r' % (value,))
+
+
+# type -> (accepted types, convert), the other types convert by calling themselves
+_coercions = {
+    bool: (bool, _to_bool),
+    int: (_integer_types, _to_int),
+    float: (float, _to_float),
+    str: (_string_types, _to_str),
+}
+
+
+def _coercion(kind):
+    """return (accepted types, convert), the value is converted only if it is not accepted"""
+    return _coercions.get(kind, (kind, kind))
+
+
+def _list_converter(convert):
+    def convert_list(value):
+        return [convert(item) for item in value]
+
+    return convert_list
+
+
+def _object_converter(dynamic_class, plan):
+    new = dynamic_class.__new__
+
+    def convert_object(value):
+        if not isinstance(value, dict):
+            raise ValueError('expecting json object for %s' % dynamic_class.__name__)
+        for key, accepted, convert in plan:
+            item = value.get(key)
+            if item is not None and not isinstance(item, accepted):
+                value[key] = convert(item)
+        obj = new(dynamic_class)
+        obj.__dict__ = value
+        return obj
+
+    return convert_object
+
+
+def _build(spec, name):
+    """return (accepted types, convert) of the spec"""
+    if isinstance(spec, dict):
+        field_names = list(spec)
+        dynamic_class = make_dynamic_class(name, field_names)
+        plan = [(key,) + _build(spec[key], '%s_%s' % (name, key)) for key in field_names]
+        return _nothing, _object_converter(dynamic_class, plan)
+    elif isinstance(spec, list):
+        if len(spec) != 1:
+            raise ValueError('list schema must contain exactly one item schema')
+        accepted, convert = _build(spec[0], name)
+        if accepted is not _nothing:
+            convert = _converter(accepted, convert)
+        return _nothing, _list_converter(convert)
+    elif spec is None or spec is object:
+        return _number_types + (_string_types,), _lazy
+    elif isinstance(spec, type):
+        return _coercion(spec)
+    elif callable(spec):
+        return _nothing, spec
+    raise ValueError('invalid schema: %r' % (spec,))
+
+
+def _converter(accepted, convert):
+    def coerce(value):
+        if value is None or isinstance(value, accepted):
+            return value
+        return convert(value)
+
+    return coerce
+
+
+class Decoder(object):
+    """A decoder compiled from a schema, see :func:`compile`"""
+
+    def __init__(self, schema, name='Schema'):
+        self.schema = schema
+        accepted, convert = _build(schema, name)
+        if accepted is not _nothing:
+            convert = _converter(accepted, convert)
+        self._convert = convert
+
+    def convert(self, value):
+        """convert a plain decoded json value
+
+        :param value: :class:`dict`, :class:`list` or a scalar
+        :return: :class:`object` or :class:`list`
+        """
+        if value is None:
+            return None
+        return self._convert(value)
+
+    def loads(self, text):
+        """Deserialize json string to objects of the schema
+
+        :param text: string
+        :return: :class:`object` or :class:`list`, ``None`` if the text is not valid json
+            or a value can't be coerced
+        """
+        try:
+            return self.convert(get_backend().loads(text))
+        except (ValueError, TypeError):
+            return None
+
+    def load(self, fp):
+        """Deserialize file object to objects of the schema
+
+        :param fp: file object
+        :return: :class:`object` or :class:`list`, ``None`` if the text is not valid json
+            or a value can't be coerced
+        """
+        try:
+            return self.convert(get_backend().load(fp))
+        except (ValueError, TypeError):
+            return None
+
+
+def compile(schema, name='Schema'):
+    """compile a decoder from the schema of the payload
+
+    The schema is made up of:
+
+    - :class:`dict`, a json object, maps the field name to its schema, a class is
+      generated by :func:`make_dynamic_class` for it
+    - :class:`list` with one item, a json array, every element has the item schema
+    - a type like :class:`int`, :class:`float`, :class:`bool` or :class:`str`, the
+      value is coerced to it, or any callable which converts the value. :class:`int`
+      takes the whole numbers and the numeric strings, not ``1.5``, :class:`bool` takes
+      only the booleans and the strings ``"true"`` and ``"false"``, :class:`str` takes
+      the numbers, the other values make the decoding fail
+    - ``None`` or :class:`object`, the value is kept as what :func:`objson.loads` returns
+
+    The fields which are not in the schema are kept as plain decoded values.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> decoder = objson.compile([{'Id': str, 'Created': int, 'Names': [str],
+    ...                            'status': {'Running': bool}}], name='Container')
+    >>> containers = decoder.loads(r'[{"Id": "a1", "Created": "1460", "Names": ["/web"],'
+    ...                            r' "status": {"Running": true}}]')
+    >>> containers[0].Created
+    1460
+
+    :param schema: the schema of payload
+    :param name: :class:`str`, the name of the generated class for the top object,
+        the nested ones are suffixed with their field name
+    :return: :class:`Decoder`
+    """
+    return Decoder(schema, name)
@@ -0,0 +1,327 @@
+"""
+Incremental helpers used to read large json documents piece by piece
+"""
+import codecs
+import json
+import mmap as _mmap
+import re
+
+from .dolphin2 import DolphinEncoder, object_hook
+
+__author__ = 'benjamin.c.yan'
+
+_whitespace = ' \t\n\r'
+
+_re_whitespace = re.compile(r'[ \t\n\r]*')
+
+# the characters which may continue a number, like the ``.5`` of ``1.5`` or the ``e5`` of ``3e5``
+_re_number_tail = re.compile(r'[0-9.eE+-]*')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_BATCH_SIZE = 1000
+
+# the levels of containers decoded member by member by load_path
+DOCUMENT_DEPTH = 2
+
+
+class _Reader(object):
+    """A sliding window over a file object.
+
+    Only the text which has not been consumed yet is kept in the buffer,
+    the window grows when a single value does not fit in it.
+    """
+
+    def __init__(self, fp, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = None
+        self.buf = self._read(chunk_size)
+        self.pos = 0
+        self.eof = not self.buf
+
+    def _read(self, size):
+        data = self._fp.read(size)
+        if not isinstance(data, str) and isinstance(data, bytes):
+            # binary file object under python 3
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8')()
+            data = self._decoder.decode(data, not data)
+        return data
+
+    def more(self):
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        data = self._read(max(self._chunk_size, len(self.buf)))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self):
+        buf, pos = self.buf, self.pos
+        if pos < len(buf) and buf[pos] not in _whitespace:
+            return buf[pos]
+        while True:
+            self.pos = _re_whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError('Expecting %r at position %d' % (char, self.pos))
+        self.pos += 1
+
+    def decode(self, decoder):
+        self.peek()
+        scan_once = decoder.scan_once
+        while True:
+            try:
+                value, end = scan_once(self.buf, self.pos)
+            except (StopIteration, ValueError):
+                if self.more():
+                    continue
+                raise ValueError('No JSON object could be decoded at position %d' % self.pos)
+            # a number at the end of the window may continue in the next chunk, also when
+            # it's cut after ``.``, ``e`` or ``e+`` which the scanner leaves unconsumed
+            if not self.eof and _re_number_tail.match(self.buf, end).end() == len(self.buf) and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def _delimiter(reader, close):
+    """consume the delimiter after a member, return True at the end of container"""
+    pos = reader.pos
+    if pos < len(reader.buf) and reader.buf[pos] == ',':
+        reader.pos = pos + 1
+        return False
+    char = reader.peek()
+    reader.pos += 1
+    if char == close:
+        return True
+    elif char != ',':
+        raise ValueError('Expecting , delimiter at position %d' % (reader.pos - 1))
+    return False
+
+
+def _split_prefix(prefix):
+    if not prefix:
+        return []
+    if isinstance(prefix, (list, tuple)):
+        return list(prefix)
+    return prefix.split('.')
+
+
+def _seek(reader, keys, decoder):
+    """move the reader to the value located by ``keys``, return False if absent"""
+    for key in keys:
+        reader.expect('{')
+        if reader.peek() == '}':
+            return False
+        while True:
+            name = reader.decode(decoder)
+            reader.expect(':')
+            if name == key:
+                break
+            reader.decode(decoder)
+            if _delimiter(reader, '}'):
+                return False
+    return True
+
+
+def iterload(fp, prefix=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Deserialize a json array from file object one element at a time
+
+    The document is parsed incrementally, so the memory used is bounded by the
+    largest single element instead of the whole file.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> from StringIO import StringIO
+    >>> fp = StringIO(r'{"Total": 2, "Containers": [{"Id": "a"}, {"Id": "b"}]}')
+    >>> [c.Id for c in objson.iterload(fp, prefix='Containers')]
+    [u'a', u'b']
+
+    :param fp: file object, contains a json document
+    :param prefix: dot separated object keys locating the array, like ``"data.items"``,
+        ``None`` means the document itself is an array
+    :param chunk_size: :class:`int`, size of each read from ``fp``
+    :return: generator of :class:`Dolphin` or plain json values
+    :raise ValueError: the document is malformed, or the value located is not an array
+    """
+    reader = _Reader(fp, chunk_size)
+    plain = json.JSONDecoder()
+    if not _seek(reader, _split_prefix(prefix), plain):
+        return
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+
+    decoder = json.JSONDecoder(object_hook=object_hook)
+    while True:
+        yield reader.decode(decoder)
+        if _delimiter(reader, ']'):
+            return
+
+
+def _decode(reader, plain, decoder, depth):
+    """decode a value, the containers above ``depth`` are decoded member by member
+
+    Only the text of one member is buffered at a time, instead of the whole container.
+    """
+    char = reader.peek()
+    if depth <= 0 or not char or char not in '[{':
+        return reader.decode(decoder)
+
+    reader.pos += 1
+    if char == '[':
+        value = []
+        if reader.peek() == ']':
+            reader.pos += 1
+            return value
+        if depth == 1:
+            while True:
+                value.append(reader.decode(decoder))
+                if _delimiter(reader, ']'):
+                    return value
+        while True:
+            value.append(_decode(reader, plain, decoder, depth - 1))
+            if _delimiter(reader, ']'):
+                return value
+
+    members = []
+    if reader.peek() == '}':
+        reader.pos += 1
+        return _object(decoder, members)
+    while True:
+        key = reader.decode(plain)
+        reader.expect(':')
+        members.append((key, _decode(reader, plain, decoder, depth - 1)))
+        if _delimiter(reader, '}'):
+            return _object(decoder, members)
+
+
+def _object(decoder, pairs):
+    """build a object from its members by the hooks of ``decoder``"""
+    if decoder.object_pairs_hook is not None:
+        return decoder.object_pairs_hook(pairs)
+    members = dict(pairs)
+    return decoder.object_hook(members) if decoder.object_hook is not None else members
+
+
+def _load_document(reader, decoder=None):
+    if decoder is None:
+        decoder = json.JSONDecoder(object_hook=object_hook)
+    value = _decode(reader, json.JSONDecoder(), decoder, DOCUMENT_DEPTH)
+    if reader.peek():
+        raise ValueError('Extra data at position %d' % reader.pos)
+    return value
+
+
+def _load_stream(fp, cls=None, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """like :func:`json.load`, but ``fp`` is read in chunks and the top level members are
+    decoded one at a time, see :func:`load_path`
+    """
+    return _load_document(_Reader(fp, chunk_size), (cls or json.JSONDecoder)(**kwargs))
+
+
+def load_path(path, mmap=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Deserialize a json file by path
+
+    With ``mmap`` the file is mapped read only and parsed through a sliding
+    window, the top level members are decoded one at a time, so the whole
+    text is never held in memory along with the objects.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> settings = objson.load_path('/opt/app/settings.json')
+
+    :param path: :class:`str`, the path of json file
+    :param mmap: :class:`bool`, map the file into memory instead of reading it
+    :param chunk_size: :class:`int`, the size of window
+    :return: :class:`object` or :class:`list`, ``None`` if the file is not valid json
+    """
+    with open(path, 'rb') as fp:
+        try:
+            if not mmap:
+                return _load_document(_Reader(fp, chunk_size))
+            buf = _mmap.mmap(fp.fileno(), 0, access=_mmap.ACCESS_READ)
+            try:
+                return _load_document(_Reader(buf, chunk_size))
+            finally:
+                buf.close()
+        except ValueError:
+            return None
+
+
+def load_lines(fp):
+    """Deserialize a JSON Lines (newline delimited json) file object
+
+    Blank lines are skipped, every other line must hold a whole json document.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> from StringIO import StringIO
+    >>> fp = StringIO('{"name": "benjamin"}\\n{"name": "wendy"}\\n')
+    >>> [person.name for person in objson.load_lines(fp)]
+    [u'benjamin', u'wendy']
+
+    :param fp: file object, or any iterable of lines, the binary lines are decoded as utf-8
+    :return: generator of :class:`Dolphin` or plain json values
+    :raise ValueError: a line is not a valid json document
+    """
+    decode = json.JSONDecoder(object_hook=object_hook).decode
+    for line in fp:
+        if not isinstance(line, str) and isinstance(line, bytes):
+            # binary file object under python 3
+            line = line.decode('utf-8')
+        line = line.strip()
+        if line:
+            yield decode(line)
+
+
+def dump_lines(iterable, fp, batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+    """Serialize objects to a file object as JSON Lines
+
+    The records are encoded by one shared encoder and written ``batch_size``
+    lines at a time, instead of one ``write`` per record.
+
+    Basic Usage:
+
+    >>> from simplekit import objson
+    >>> from StringIO import StringIO
+    >>> io = StringIO()
+    >>> objson.dump_lines([{'name': 'benjamin'}, {'name': 'wendy'}], io)
+    >>> print io.getvalue()
+
+    :param iterable: objects which need to dump, one per line
+    :param fp: a instance of file object
+    :param batch_size: :class:`int`, number of lines per ``write``
+    :param kwargs: Keys arguments that :class:`json.JSONEncoder` takes, ``indent`` is not allowed.
+    :return: None
+    """
+    if kwargs.get('indent') is not None:
+        raise ValueError('indent is not allowed in JSON Lines')
+    encode = DolphinEncoder(**kwargs).encode
+
+    batch = []
+    for obj in iterable:
+        batch.append(encode(obj))
+        if len(batch) >= batch_size:
+            batch.append('')
+            fp.write('\n'.join(batch))
+            batch = []
+    if batch:
+        batch.append('')
+        fp.write('\n'.join(batch))
@@ -0,0 +1,3 @@
+"""
+Benchmarks of objson, run ``python -m test.benchmark --help``
+"""
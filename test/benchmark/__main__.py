@@ -0,0 +1,71 @@
+"""
+Command line of the objson benchmarks
+
+Usage::
+
+    python -m test.benchmark --output results.json
+    python -m test.benchmark --filter loads --baseline baseline.json --threshold 0.1
+"""
+from __future__ import print_function
+
+import argparse
+import sys
+
+from . import cases
+from . import runner
+
+__author__ = 'benjamin.c.yan'
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '%8.3f %-2s' % (seconds / scale, unit)
+    return '%8.3f ns' % (seconds / 1e-9)
+
+
+def _report(name, result):
+    memory = result['peak_memory']
+    memory = '%10.1f KiB' % (memory / 1024.0) if memory is not None else '%14s' % '-'
+    print('%-45s %s +- %s %s' % (name, _format_time(result['median']), _format_time(result['stdev']), memory))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m test.benchmark', description='objson benchmarks')
+    parser.add_argument('--filter', action='append', default=[],
+                        help='only run the cases whose name contains the text, can be repeated')
+    parser.add_argument('--repeat', type=int, default=runner.DEFAULT_REPEAT,
+                        help='number of timed samples per case')
+    parser.add_argument('--min-time', type=float, default=runner.DEFAULT_MIN_TIME,
+                        help='minimum seconds of one sample')
+    parser.add_argument('--output', help='write the results as json to the file')
+    parser.add_argument('--baseline', help='compare the results with a saved results file')
+    parser.add_argument('--threshold', type=float, default=runner.DEFAULT_THRESHOLD,
+                        help='allowed relative slowdown before a case counts as regression')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args(argv)
+
+    selected = [case for case in cases.CASES
+                if not args.filter or any(text in case.name for text in args.filter)]
+    if args.list:
+        for case in selected:
+            print(case.name)
+        return 0
+
+    results = runner.run(selected, args.repeat, args.min_time, report=_report)
+    if args.output:
+        runner.save(results, args.output)
+
+    if args.baseline:
+        regressions = runner.compare(results, runner.load(args.baseline), args.threshold)
+        for name, metric, base, current, ratio in regressions:
+            print('REGRESSION %s %s: %.6g -> %.6g (x%.2f)' % (name, metric, base, current, ratio))
+        if regressions:
+            return 1
+        print('no regression against %s' % args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
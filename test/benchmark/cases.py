@@ -0,0 +1,246 @@
+"""
+The benchmark cases, each one is built from a payload of :mod:`corpus`
+"""
+import collections
+import io
+import json
+import threading
+import zlib
+
+from simplekit import objson
+from simplekit.objson import dolphin
+from simplekit.objson.dynamic_class import make_dynamic_class
+
+from . import corpus
+
+__author__ = 'benjamin.c.yan'
+
+Case = collections.namedtuple('Case', 'name setup payload')
+
+CASES = []
+
+ALL = sorted(corpus.PAYLOADS)
+
+OBJECTS = ['small', 'wide', 'deep', 'docker_inspect']
+
+
+def case(name, payloads=ALL):
+    """register the decorated setup function for every payload
+
+    The setup function takes the json text and returns the callable to time.
+    """
+
+    def decorator(setup):
+        for payload in payloads:
+            CASES.append(Case('%s/%s' % (name, payload), setup, payload))
+        return setup
+
+    return decorator
+
+
+@case('json.loads')
+def json_loads(text):
+    return lambda: json.loads(text)
+
+
+@case('dolphin2.loads')
+def dolphin2_loads(text):
+    return lambda: objson.loads(text)
+
+
+@case('dolphin2.loads_lazy')
+def dolphin2_loads_lazy(text):
+    return lambda: objson.loads(text, lazy=True)
+
+
+@case('dolphin2.loads_intern')
+def dolphin2_loads_intern(text):
+    return lambda: objson.loads(text, intern=True)
+
+
+@case('dolphin2.loads_share')
+def dolphin2_loads_share(text):
+    return lambda: objson.loads(text, share=True)
+
+
+@case('dolphin2.loads_fields', ['docker_containers', 'large_array'])
+def dolphin2_loads_fields(text):
+    return lambda: objson.loads(text, fields=['Id', 'Names'])
+
+
+@case('dolphin.loads')
+def dolphin_loads(text):
+    return lambda: dolphin.loads(text)
+
+
+@case('dolphin.loads_threads', ['docker_containers', 'small'])
+def dolphin_loads_threads(text, threads=4):
+    def run():
+        workers = [threading.Thread(target=dolphin.loads, args=(text,)) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    return run
+
+
+@case('dolphin.cache_churn', ['small'])
+def dolphin_cache_churn(text, maxsize=dolphin.DEFAULT_CACHE_SIZE):
+    # twice the shapes of the cache cycled through, every lookup evicts a class
+    cache = dolphin.ShapeCache(maxsize)
+    shapes = [frozenset(json.loads(text)) | frozenset(['key%d' % i]) for i in range(2 * maxsize)]
+
+    def run():
+        for shape in shapes:
+            cache.get(shape)
+
+    return run
+
+
+@case('json.dumps')
+def json_dumps(text):
+    obj = json.loads(text)
+    return lambda: json.dumps(obj)
+
+
+@case('dolphin2.dumps')
+def dolphin2_dumps(text):
+    obj = objson.loads(text)
+    return lambda: objson.dumps(obj)
+
+
+@case('dolphin2.dumps_tracked', ['docker_containers', 'large_array', 'docker_inspect'])
+def dolphin2_dumps_tracked(text):
+    obj = objson.track(objson.loads(text))
+    objson.dumps(obj)
+    item = obj[len(obj) // 2] if isinstance(obj, list) else obj
+
+    def change():
+        item['edited'] = not item['edited']
+        return objson.dumps(obj)
+
+    return change
+
+
+@case('dolphin.dumps')
+def dolphin_dumps(text):
+    obj = dolphin.loads(text)
+    return lambda: dolphin.dumps(obj)
+
+
+@case('dolphin2.eq')
+def dolphin2_eq(text):
+    left, right = objson.loads(text), objson.loads(text)
+    return lambda: left == right
+
+
+@case('freeze', OBJECTS)
+def freeze(text):
+    obj = objson.loads(text)
+    return lambda: hash(objson.freeze(obj))
+
+
+@case('clone', OBJECTS)
+def clone(text):
+    obj = objson.loads(text)
+
+    def change():
+        objson.clone(obj)['extra'] = 1
+
+    return change
+
+
+@case('compile_path', ['docker_containers'])
+def compile_path(text):
+    containers = objson.loads(text)
+    names = objson.compile_path('[*].Names[0]')
+    network = objson.compile_path('HostConfig.NetworkMode')
+    return lambda: (names(containers), network.many(containers))
+
+
+@case('attribute_chain', ['docker_containers'])
+def attribute_chain(text):
+    containers = objson.loads(text)
+    return lambda: (list(map(lambda container: container.Names[0], containers)),
+                    list(map(lambda container: container.HostConfig.NetworkMode, containers)))
+
+
+def _keys(text):
+    return list(json.loads(text))
+
+
+@case('dolphin2.getattr', OBJECTS)
+def dolphin2_getattr(text):
+    obj = objson.loads(text)
+    names = [key.replace('-', '_') for key in _keys(text)]
+
+    def get():
+        for name in names:
+            getattr(obj, name)
+
+    return get
+
+
+@case('dolphin2.setattr', OBJECTS)
+def dolphin2_setattr(text):
+    obj = objson.loads(text)
+    names = [str(key) for key in _keys(text)]
+
+    def set_():
+        for name in names:
+            setattr(obj, name, 1)
+
+    return set_
+
+
+@case('dynamic_class.getattr', OBJECTS)
+def dynamic_class_getattr(text):
+    obj = dolphin.loads(text)
+    names = [key.replace('-', '_') for key in _keys(text)]
+
+    def get():
+        for name in names:
+            getattr(obj, name)
+
+    return get
+
+
+@case('dynamic_class.create', OBJECTS)
+def dynamic_class_create(text):
+    kv = json.loads(text)
+    dynamic_class = make_dynamic_class('Entity', list(kv))
+    return lambda: [dynamic_class(kv) for _ in range(100)]
+
+
+@case('dynamic_class.create_slots', OBJECTS)
+def dynamic_class_create_slots(text):
+    kv = json.loads(text)
+    dynamic_class = make_dynamic_class('Entity', list(kv), slots=True)
+    return lambda: [dynamic_class(kv) for _ in range(100)]
+
+
+@case('compile.loads', ['docker_containers'])
+def compile_loads(text):
+    decoder = objson.compile([{'Id': str, 'Names': [str], 'Created': int, 'SizeRw': int,
+                               'Ports': [{'PrivatePort': int, 'PublicPort': int, 'Type': str}],
+                               'Labels': None}], name='Container')
+    return lambda: decoder.loads(text)
+
+
+@case('loads_columnar', ['docker_containers', 'large_array'])
+def loads_columnar(text):
+    return lambda: objson.loads_columnar(text)
+
+
+@case('load_gzip', ['docker_containers', 'large_array'])
+def load_gzip(text):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    data = compressor.compress(text.encode('utf-8')) + compressor.flush()
+    return lambda: objson.load(io.BytesIO(data), compression='gzip')
+
+
+@case('dump_gzip', ['docker_containers', 'large_array'])
+def dump_gzip(text):
+    obj = objson.loads(text)
+    return lambda: objson.dump(obj, io.BytesIO(), compression='gzip')
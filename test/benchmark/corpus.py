@@ -0,0 +1,85 @@
+"""
+Payloads used by the benchmarks, every generator is deterministic
+"""
+import json
+import random
+
+__author__ = 'benjamin.c.yan'
+
+_images = ['docker.neg/%s:%d' % (name, version)
+           for name in ('web', 'db', 'cache', 'queue') for version in range(3)]
+
+
+def small():
+    return {"name": "benjamin.c.yan", "age": 21, "sex": "male", "married": True}
+
+
+def wide(width=200):
+    return dict(('field-%d' % i, 'value %d' % i if i % 2 else i) for i in range(width))
+
+
+def deep(depth=50):
+    doc = {"value": 0}
+    for i in range(1, depth):
+        doc = {"value": i, "child": doc, "class": "level"}
+    return doc
+
+
+def large_array(length=5000):
+    return [{"Id": i, "Name": "item-%d" % i, "Price": i * 1.5, "Tags": ["a", "b"]} for i in range(length)]
+
+
+def container(i, rand):
+    return {"Id": "%064x" % i,
+            "Names": ["/svc-%d" % i],
+            "Image": rand.choice(_images),
+            "Command": "/bin/sh -c run",
+            "Created": 1460000000 + i,
+            "State": rand.choice(['running', 'exited']),
+            "Status": rand.choice(['Up 2 hours', 'Exited (0) 3 days ago']),
+            "Ports": [{"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8000 + i % 1000, "Type": "tcp"}],
+            "Labels": {"env": "gdev", "team": "bts"},
+            "HostConfig": {"NetworkMode": "bridge"},
+            "SizeRw": rand.randint(0, 1 << 20)}
+
+
+def docker_containers(length=1000):
+    """the shape of ``Docker.get_containers``"""
+    rand = random.Random(46)
+    return [container(i, rand) for i in range(length)]
+
+
+def docker_inspect():
+    """the shape of ``Docker.get_container``"""
+    rand = random.Random(46)
+    doc = container(1, rand)
+    doc['status'] = {"Running": True, "Paused": False, "Restarting": False, "OOMKilled": False,
+                     "Dead": False, "Pid": 1234, "ExitCode": 0, "Error": "",
+                     "StartedAt": "2016-04-07T08:00:00.000000000Z",
+                     "FinishedAt": "0001-01-01T00:00:00Z"}
+    doc['Config'] = {"Hostname": "dfis", "Env": ["var%d=value%d" % (i, i) for i in range(20)],
+                     "Cmd": ["/bin/sh", "-c", "run"], "Volumes": {"/app-conf": {}},
+                     "WorkingDir": "/opt/app", "Entrypoint": None}
+    doc['Mounts'] = [{"Source": "/opt/app/app-conf", "Destination": "/app-conf", "Mode": "", "RW": True}]
+    return doc
+
+
+def docker_tags(length=300):
+    """the shape of ``Repository.image_tags``"""
+    return {"name": "web", "tags": ["1.%d.%d" % (i // 10, i % 10) for i in range(length)] + ["latest"]}
+
+
+PAYLOADS = {
+    'small': small,
+    'wide': wide,
+    'deep': deep,
+    'large_array': large_array,
+    'docker_containers': docker_containers,
+    'docker_inspect': docker_inspect,
+    'docker_tags': docker_tags,
+}
+
+
+def load(name):
+    """the json text of payload ``name``"""
+    return json.dumps(PAYLOADS[name]())
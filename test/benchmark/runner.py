@@ -0,0 +1,146 @@
+"""
+Timing, memory measurement and baseline comparison of the benchmark cases
+"""
+import gc
+import json
+import math
+import platform
+import time
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from . import corpus
+
+__author__ = 'benjamin.c.yan'
+
+DEFAULT_REPEAT = 7
+
+DEFAULT_MIN_TIME = 0.05
+
+DEFAULT_THRESHOLD = 0.1
+
+
+def _run(fn, number):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = timeit.default_timer()
+        for _ in range(number):
+            fn()
+        return timeit.default_timer() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _calibrate(fn, min_time):
+    """the number of loops which takes at least ``min_time``, the calls also warm up"""
+    number = 1
+    while True:
+        elapsed = _run(fn, number)
+        if elapsed >= min_time:
+            return number
+        if elapsed <= 0:
+            number *= 10
+        else:
+            number = max(number * 2, int(number * min_time / elapsed * 1.2))
+
+
+def _statistics(samples):
+    samples = sorted(samples)
+    count = len(samples)
+    middle = count // 2
+    median = samples[middle] if count % 2 else (samples[middle - 1] + samples[middle]) / 2.0
+    mean = sum(samples) / count
+    stdev = math.sqrt(sum((x - mean) ** 2 for x in samples) / (count - 1)) if count > 1 else 0.0
+    return dict(min=samples[0], max=samples[-1], median=median, mean=mean, stdev=stdev)
+
+
+def peak_memory(fn):
+    """the peak of memory allocated by one call, ``None`` if :mod:`tracemalloc` is unavailable"""
+    if tracemalloc is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def measure(fn, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """time ``fn`` after a warmup, the statistics are seconds per call
+
+    :return: :class:`dict`
+    """
+    number = _calibrate(fn, min_time)
+    samples = [_run(fn, number) / number for _ in range(repeat)]
+    result = _statistics(samples)
+    result['loops'] = number
+    result['repeat'] = repeat
+    result['peak_memory'] = peak_memory(fn)
+    return result
+
+
+def run(cases, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME, report=None):
+    """run the benchmark cases
+
+    :param cases: :class:`list` of :class:`cases.Case`
+    :param report: callable, called with the name and the result of each case
+    :return: :class:`dict`, the machine readable results
+    """
+    texts = {}
+    results = {}
+    for case in cases:
+        if case.payload not in texts:
+            texts[case.payload] = corpus.load(case.payload)
+        result = measure(case.setup(texts[case.payload]), repeat, min_time)
+        result['payload_size'] = len(texts[case.payload])
+        results[case.name] = result
+        if report is not None:
+            report(case.name, result)
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cases': results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """compare the results with a baseline
+
+    A case regresses when its median time, or its peak memory, grows by more
+    than ``threshold`` of the baseline.
+
+    :return: :class:`list` of ``(name, metric, baseline, current, ratio)``
+    """
+    regressions = []
+    for name, current in sorted(results['cases'].items()):
+        base = baseline['cases'].get(name)
+        if base is None:
+            continue
+        for metric in ('median', 'peak_memory'):
+            if not base.get(metric) or current.get(metric) is None:
+                continue
+            ratio = float(current[metric]) / base[metric]
+            if ratio > 1 + threshold:
+                regressions.append((name, metric, base[metric], current[metric], ratio))
+    return regressions
+
+
+def save(results, path):
+    with open(path, 'w') as fp:
+        json.dump(results, fp, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as fp:
+        return json.load(fp)
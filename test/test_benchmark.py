@@ -0,0 +1,33 @@
+import unittest
+
+from test.benchmark import cases
+from test.benchmark import corpus
+from test.benchmark import runner
+
+__author__ = 'benjamin.c.yan'
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_cases_runnable(self):
+        texts = dict((name, corpus.load(name)) for name in corpus.PAYLOADS)
+        for case in cases.CASES:
+            case.setup(texts[case.payload])()
+
+    def test_measure(self):
+        result = runner.measure(lambda: sum(range(100)), repeat=3, min_time=0.001)
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertLessEqual(result['median'], result['max'])
+        self.assertEqual(3, result['repeat'])
+        self.assertGreaterEqual(result['loops'], 1)
+
+    def test_compare(self):
+        baseline = {'cases': {'a': {'median': 1.0, 'peak_memory': 100},
+                              'b': {'median': 1.0, 'peak_memory': None},
+                              'c': {'median': 1.0, 'peak_memory': 100}}}
+        results = {'cases': {'a': {'median': 1.05, 'peak_memory': 200},
+                             'b': {'median': 1.5, 'peak_memory': 100},
+                             'c': {'median': 0.5, 'peak_memory': 100},
+                             'd': {'median': 9.0, 'peak_memory': 100}}}
+        regressions = runner.compare(results, baseline, threshold=0.1)
+        self.assertEqual([('a', 'peak_memory'), ('b', 'median')],
+                         [(name, metric) for name, metric, _, _, _ in regressions])
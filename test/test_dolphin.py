@@ -0,0 +1,142 @@
+import json
+import pickle
+import random
+import sys
+import threading
+import unittest
+
+from simplekit.objson import dolphin
+from simplekit.objson import dynamic_class
+
+__author__ = 'benjamin.c.yan'
+
+
+class DolphinTestCase(unittest.TestCase):
+    def setUp(self):
+        dolphin.clear_cache()
+        dolphin.set_cache_size(dolphin.DEFAULT_CACHE_SIZE)
+
+    tearDown = setUp
+
+    def test_loads_normal(self):
+        text = r'{"sort":true, "name":{"first":"benjamin", "last": "yan"}}'
+        obj = dolphin.loads(text)
+        self.assertTrue(obj.sort)
+        self.assertEqual("benjamin", obj.name.first)
+        self.assertEqual("yan", obj.name.last)
+        self.assertDictEqual(json.loads(text), json.loads(dolphin.dumps(obj)))
+
+    def test_loads_knapsack(self):
+        obj = dolphin.loads(r'{"name":"benjamin", "age":21}')
+        obj2 = dolphin.loads(r'{"age":21,"name":"benjamin1"}')
+        obj3 = dolphin.loads(r'{"name":"benjamin", "age":"21"}')
+        obj4 = dolphin.loads(r'{"name":"benjamin"}')
+        self.assertEqual(type(obj), type(obj2))
+        self.assertEqual(type(obj), type(obj3))
+        self.assertNotEqual(type(obj), type(obj4))
+
+        info = dolphin.cache_info()
+        self.assertEqual(2, info.hits)
+        self.assertEqual(2, info.misses)
+        self.assertEqual(0, info.evictions)
+        self.assertEqual(2, info.currsize)
+
+    def test_cache_bounded(self):
+        dolphin.set_cache_size(4)
+        for i in range(10):
+            dolphin.loads('{"key%d": %d}' % (i, i))
+        info = dolphin.cache_info()
+        self.assertEqual(4, info.maxsize)
+        self.assertEqual(4, info.currsize)
+        self.assertEqual(6, info.evictions)
+        self.assertEqual(10, info.misses)
+
+    def test_cache_lru(self):
+        dolphin.set_cache_size(2)
+        first = type(dolphin.loads('{"a": 1}'))
+        dolphin.loads('{"b": 1}')
+        self.assertIs(first, type(dolphin.loads('{"a": 2}')))
+        dolphin.loads('{"c": 1}')
+        self.assertIs(first, type(dolphin.loads('{"a": 3}')))
+        self.assertEqual(1, dolphin.cache_info().evictions)
+
+        dolphin.set_cache_size(1)
+        self.assertEqual(1, dolphin.cache_info().currsize)
+        self.assertRaises(ValueError, dolphin.set_cache_size, 0)
+
+    def test_pickle(self):
+        text = r'{"name": "wendy", "from-cookie": true, "child": {"name": "benjamin"}}'
+        obj = dolphin.loads(text)
+        other = pickle.loads(pickle.dumps(obj, 2))
+        self.assertIs(type(obj), type(other))
+        self.assertIs(type(obj.child), type(other.child))
+        self.assertTrue(other.from_cookie)
+        self.assertEqual(json.loads(text), json.loads(dolphin.dumps(other)))
+
+    def test_pickle_knapsack(self):
+        text = pickle.dumps(dolphin.loads(r'{"name": "wendy", "age": 21}'), 2)
+        dolphin.clear_cache()
+        dynamic_class._shapes.clear()
+        obj = dolphin.loads(r'{"age": 22, "name": "benjamin"}')
+        other = pickle.loads(text)
+        self.assertIs(type(obj), type(other))
+        self.assertEqual({'name': 'wendy', 'age': 21}, json.loads(dolphin.dumps(other)))
+        self.assertEqual(1, dolphin.cache_info().currsize)
+
+    def _hammer(self, texts, threads=8, rounds=20):
+        results = []
+        errors = []
+        interval = sys.getcheckinterval() if hasattr(sys, 'getcheckinterval') else None
+        if interval is not None:
+            sys.setcheckinterval(1)
+        else:
+            interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+
+        def worker(seed):
+            try:
+                rand = random.Random(seed)
+                types = {}
+                for _ in range(rounds):
+                    order = list(texts)
+                    rand.shuffle(order)
+                    for text in order:
+                        types.setdefault(text, set()).add(type(dolphin.loads(text)))
+                results.append(types)
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        try:
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        finally:
+            if hasattr(sys, 'setcheckinterval'):
+                sys.setcheckinterval(interval)
+            else:
+                sys.setswitchinterval(interval)
+        self.assertEqual([], errors)
+        self.assertEqual(threads, len(results))
+        return results
+
+    def test_threads_no_duplicates(self):
+        dolphin.set_cache_size(None)
+        texts = ['{"key%d": 1, "shared": 2}' % i for i in range(50)]
+        results = self._hammer(texts)
+        for text in texts:
+            classes = set()
+            for types in results:
+                classes.update(types[text])
+            self.assertEqual(1, len(classes))
+        info = dolphin.cache_info()
+        self.assertEqual(50, info.misses)
+        self.assertEqual(50, info.currsize)
+
+    def test_threads_bounded(self):
+        dolphin.set_cache_size(16)
+        self._hammer(['{"key%d": 1}' % i for i in range(40)], rounds=5)
+        info = dolphin.cache_info()
+        self.assertLessEqual(info.currsize, 16)
+        self.assertEqual(info.misses - info.evictions, info.currsize)
@@ -0,0 +1,148 @@
+import copy
+import json
+import pickle
+import sys
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from simplekit import objson
+from simplekit.objson import dynamic_class
+
+__author__ = 'benjamin.c.yan'
+
+FIELDS = 'Id, Image, Command, Created, Status, Names, class, from-cookie'
+
+
+def _record(i):
+    return {'Id': i, 'Image': 'centos', 'Command': '/bin/sh', 'Created': 1460000000 + i,
+            'Status': 'Up', 'Names': None, 'class': True, 'from-cookie': False}
+
+
+class SlotsDynamicClassTestCase(unittest.TestCase):
+    def test_slots_access(self):
+        entity = objson.make_dynamic_class('Entity', FIELDS, slots=True)
+        obj = entity(_record(1))
+        self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertEqual(1, obj.Id)
+        self.assertEqual('centos', obj['Image'])
+        self.assertTrue(obj.mclass)
+        self.assertTrue(obj['class'])
+        self.assertFalse(obj.from_cookie)
+        self.assertFalse(obj['from-cookie'])
+        self.assertIsNone(obj['unknown'])
+
+        obj.Status = 'Exited'
+        self.assertEqual('Exited', obj['Status'])
+        obj['Id'] = 2
+        self.assertEqual(2, obj.Id)
+        self.assertRaises(KeyError, obj.__setitem__, 'unknown', 1)
+        self.assertRaises(AttributeError, setattr, obj, 'unknown', 1)
+
+    def test_slots_missing_fields(self):
+        entity = objson.make_dynamic_class('Entity', FIELDS, slots=True)
+        obj = entity({'Id': 1})
+        self.assertIsNone(obj.mclass)
+        self.assertIsNone(obj.from_cookie)
+        self.assertIsNone(obj.Image)
+        self.assertRaises(AttributeError, getattr, obj, 'unknown')
+        self.assertEqual(['Id'], list(obj))
+        self.assertEqual({'Id': 1}, json.loads(objson.dumps(obj)))
+        other = pickle.loads(pickle.dumps(obj, 2))
+        self.assertEqual(['Id'], list(other))
+        self.assertIsNone(other.Image)
+
+    def test_slots_iter_repr(self):
+        entity = objson.make_dynamic_class('Entity', 'name,age,age, members', slots=True)
+        compact = entity({'name': 'neweggtech', 'age': 5})
+        normal = objson.make_dynamic_class('Entity', 'name,age,members')({'name': 'neweggtech', 'age': 5})
+        self.assertEqual(sorted(normal), sorted(compact))
+        self.assertEqual(repr(normal), repr(compact))
+        self.assertEqual(json.loads(objson.dumps(normal)), json.loads(objson.dumps(compact)))
+
+    def test_slots_conflict(self):
+        # the literal field owns the attribute, whatever the order of the fields
+        for fields in (['class', 'mclass'], ['mclass', 'class']):
+            entity = objson.make_dynamic_class('Entity', fields, slots=True)
+            obj = entity({'class': 1, 'mclass': 2})
+            self.assertEqual(1, obj['class'])
+            self.assertEqual(2, obj['mclass'])
+            self.assertEqual(2, obj.mclass)
+            self.assertEqual(2, objson.make_dynamic_class('Entity', fields)({'class': 1, 'mclass': 2}).mclass)
+            self.assertEqual({'class': 1, 'mclass': 2}, json.loads(objson.dumps(obj)))
+
+    def test_slots_smaller(self):
+        normal = objson.make_dynamic_class('Entity', FIELDS)(_record(1))
+        compact = objson.make_dynamic_class('Entity', FIELDS, slots=True)(_record(1))
+        self.assertLess(sys.getsizeof(compact),
+                        sys.getsizeof(normal) + sys.getsizeof(normal.__dict__))
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_slots_memory(self):
+        records = [_record(i) for i in range(10000)]
+
+        def measure(entity):
+            tracemalloc.start()
+            try:
+                objects = [entity(record) for record in records]
+                size = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            self.assertEqual(len(records), len(objects))
+            return size
+
+        normal = measure(objson.make_dynamic_class('Entity', FIELDS))
+        compact = measure(objson.make_dynamic_class('Entity', FIELDS, slots=True))
+        self.assertLess(compact, normal * 0.6)
+
+
+class PickleDynamicClassTestCase(unittest.TestCase):
+    def check(self, obj, expected):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            other = pickle.loads(pickle.dumps(obj, protocol))
+            self.assertEqual(expected, json.loads(objson.dumps(other)))
+            self.assertEqual(repr(obj), repr(other))
+        self.assertEqual(expected, json.loads(objson.dumps(copy.deepcopy(obj))))
+        self.assertEqual(expected, json.loads(objson.dumps(copy.copy(obj))))
+
+    def test_pickle(self):
+        entity = objson.make_dynamic_class('Entity', FIELDS)
+        obj = entity(_record(1))
+        self.check(obj, _record(1))
+        self.assertIs(entity, type(pickle.loads(pickle.dumps(obj, 2))))
+
+        obj.extra = [entity(_record(2))]
+        del obj.Status
+        expected = _record(1)
+        expected['extra'] = [_record(2)]
+        del expected['Status']
+        self.check(obj, expected)
+
+    def test_pickle_slots(self):
+        entity = objson.make_dynamic_class('Entity', FIELDS, slots=True)
+        self.check(entity(_record(1)), _record(1))
+        self.check(entity({'Id': 1, 'class': 2}), {'Id': 1, 'class': 2})
+
+    def test_pickle_new_process(self):
+        text = pickle.dumps(objson.make_dynamic_class('Entity', FIELDS)(_record(1)), 2)
+        dynamic_class._shapes.clear()
+        obj = pickle.loads(text)
+        self.assertEqual('Entity', type(obj).__name__)
+        self.assertFalse(obj.from_cookie)
+        self.assertRaises(AttributeError, getattr, obj, 'unknown')
+        self.assertIs(type(obj), type(pickle.loads(text)))
+
+    def test_pickle_wide(self):
+        fields = ['field%d' % i for i in range(300)]
+        entity = objson.make_dynamic_class('Entity', fields)
+        self.check(entity(dict((name, i) for i, name in enumerate(fields))),
+                   dict((name, i) for i, name in enumerate(fields)))
+
+    def test_pickle_compact(self):
+        entity = objson.make_dynamic_class('Entity', FIELDS)
+        records = [_record(i) for i in range(100)]
+        self.assertLess(len(pickle.dumps([entity(record) for record in records], 2)),
+                        len(pickle.dumps(records, 2)))
@@ -3,7 +3,10 @@ try:
 except ImportError:
     from StringIO import StringIO
 
+import collections
+import copy
 import json
+import pickle
 import unittest
 
 from simplekit import objson
@@ -231,3 +234,465 @@ class Dolphin2TestCase(unittest.TestCase):
         obj2 = objson.empty(dict(name='benjamin'))
         self.assertEqual(obj, obj2)
 
+
+class LazyDolphinTestCase(unittest.TestCase):
+    text = r'{"Id": "a1", "status": {"Running": true, "Pid": 12}, "Names": ["/web"], ' \
+           r'"Ports": [{"PublicPort": 80}], "from-cookie": true, "class": 1}'
+
+    def test_loads_lazy(self):
+        obj = objson.loads(self.text, lazy=True)
+        self.assertEqual("a1", obj.Id)
+        self.assertTrue(obj.status.Running)
+        self.assertEqual(12, obj['status']['Pid'])
+        self.assertEqual(["/web"], obj.Names)
+        self.assertEqual(80, obj.Ports[0].PublicPort)
+        self.assertTrue(obj.from_cookie)
+        self.assertEqual(1, obj.mclass)
+        self.assertIsNone(obj.missing)
+        self.assertEqual(sorted(json.loads(self.text)), sorted(obj))
+
+    def test_loads_lazy_deferred(self):
+        obj = objson.loads(self.text, lazy=True)
+        self.assertIsInstance(obj._raw['status'], dict)
+        status = obj.status
+        self.assertIsInstance(status, objson.dolphin2.Dolphin)
+        self.assertIs(status, obj.status)
+        self.assertIs(status, obj['status'])
+
+    def test_loads_lazy_list(self):
+        items = objson.loads('[%s, 1]' % self.text, lazy=True)
+        self.assertEqual("a1", items[0].Id)
+        self.assertEqual(1, items[1])
+
+    def test_lazy_change_dumps(self):
+        obj = objson.loads(self.text, lazy=True)
+        obj.Id = "b2"
+        obj.status.Running = False
+        obj['extra'] = [1]
+        del obj.Ports
+        self.assertIsNone(obj.Ports)
+        expected = json.loads(self.text)
+        expected['Id'] = "b2"
+        expected['status']['Running'] = False
+        expected['extra'] = [1]
+        del expected['Ports']
+        self.assertEqual(expected, json.loads(objson.dumps(obj)))
+        self.assertEqual(json.loads(objson.dumps(objson.loads(objson.dumps(obj)))),
+                         json.loads(objson.dumps(obj)))
+        self.assertEqual("b2", objson.empty(obj).Id)
+
+    def test_loads_lazy_exceptions(self):
+        self.assertIsNone(objson.loads("{", lazy=True))
+
+    def test_lazy_pickle(self):
+        obj = objson.loads(self.text, lazy=True)
+        self.assertTrue(obj.status.Running)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            other = pickle.loads(pickle.dumps(obj, protocol))
+            self.assertIsInstance(other, objson.dolphin2.LazyDolphin)
+            self.assertEqual(json.loads(self.text), json.loads(objson.dumps(other)))
+            self.assertEqual(12, other.status.Pid)
+        other = copy.copy(obj)
+        other.Id = 'b2'
+        self.assertEqual('a1', obj.Id)
+
+
+class DolphinEqualityTestCase(unittest.TestCase):
+    text = r'{"Id": "a1", "status": {"Running": true}, "Ports": [{"PublicPort": 80}], "class": 1}'
+
+    def test_equal(self):
+        obj = objson.loads(self.text)
+        self.assertEqual(obj, objson.loads(self.text))
+        self.assertEqual(obj, objson.loads(self.text, lazy=True))
+        self.assertEqual(objson.loads(self.text, lazy=True), obj)
+        self.assertEqual(obj, json.loads(self.text))
+        self.assertEqual(json.loads(self.text), obj)
+        self.assertFalse(obj != objson.loads(self.text))
+
+        other = objson.loads(self.text)
+        other.Ports[0].PublicPort = 8080
+        self.assertNotEqual(obj, other)
+        self.assertNotEqual(obj, objson.loads('{"Id": "a1"}'))
+        self.assertNotEqual(obj, self.text)
+        self.assertNotEqual(obj, None)
+
+    def test_unhashable(self):
+        self.assertRaises(TypeError, hash, objson.empty())
+
+    def test_freeze(self):
+        obj = objson.loads(self.text)
+        frozen = objson.freeze(obj)
+        self.assertIsInstance(frozen, objson.dolphin2.FrozenDolphin)
+        self.assertIsInstance(frozen.status, objson.dolphin2.FrozenDolphin)
+        self.assertEqual((80,), tuple(port.PublicPort for port in frozen.Ports))
+        self.assertIsInstance(frozen.Ports, tuple)
+        self.assertEqual(1, frozen.mclass)
+        self.assertEqual(hash(frozen), hash(objson.freeze(objson.loads(self.text, lazy=True))))
+        self.assertEqual(json.loads(self.text), json.loads(objson.dumps(frozen)))
+        self.assertIs(frozen, objson.freeze(frozen))
+
+        self.assertRaises(TypeError, setattr, frozen, 'Id', 'b2')
+        self.assertRaises(TypeError, frozen.__setitem__, 'Id', 'b2')
+        self.assertRaises(TypeError, delattr, frozen, 'Id')
+        self.assertEqual('a1', frozen.Id)
+
+    def test_freeze_set(self):
+        items = objson.loads('[%s, %s, {"Id": "b2"}]' % (self.text, self.text))
+        frozen = [objson.freeze(item) for item in items]
+        self.assertEqual(2, len(set(frozen)))
+        self.assertEqual({frozen[0]: 1}, {frozen[1]: 1})
+        self.assertNotEqual(frozen[0], frozen[2])
+        self.assertEqual(frozen[0], pickle.loads(pickle.dumps(frozen[0], 2)))
+        self.assertEqual(hash(frozen[0]), hash(copy.deepcopy(frozen[0])))
+
+    def test_freeze_equal(self):
+        obj = objson.loads(self.text)
+        frozen = objson.freeze(obj)
+        for other in (obj, objson.loads(self.text, lazy=True), json.loads(self.text)):
+            self.assertEqual(frozen, other)
+            self.assertEqual(other, frozen)
+            self.assertFalse(frozen != other)
+        self.assertEqual(objson.freeze(obj.status), obj.status)
+        obj.Ports.append({"PublicPort": 443})
+        self.assertNotEqual(frozen, obj)
+        self.assertNotEqual(obj, frozen)
+
+
+class CloneTestCase(unittest.TestCase):
+    text = r'{"Image": "web", "HostConfig": {"NetworkMode": "bridge", "Binds": ["/app:/app"]}, ' \
+           r'"Labels": {"env": "gdev"}, "Ports": [{"PublicPort": 80}], "from-cookie": true}'
+
+    def check_clone(self, template):
+        expected = json.loads(self.text)
+        body = objson.clone(template)
+        self.assertEqual(template, body)
+        self.assertEqual('bridge', body.HostConfig.NetworkMode)
+        self.assertTrue(body.from_cookie)
+
+        body.Image = 'db'
+        body.HostConfig.NetworkMode = 'host'
+        body.HostConfig.Binds.append('/data:/data')
+        body.Ports[0].PublicPort = 8080
+        body['extra'] = 1
+        delattr(body, 'from-cookie')
+        self.assertEqual(expected, json.loads(objson.dumps(template)))
+
+        changed = json.loads(self.text)
+        changed['Image'] = 'db'
+        changed['HostConfig'] = {'NetworkMode': 'host', 'Binds': ['/app:/app', '/data:/data']}
+        changed['Ports'] = [{'PublicPort': 8080}]
+        changed['extra'] = 1
+        del changed['from-cookie']
+        self.assertEqual(changed, json.loads(objson.dumps(body)))
+        self.assertEqual(changed, body)
+        self.assertEqual('gdev', body.Labels.env)
+        return body
+
+    def test_clone(self):
+        self.check_clone(objson.loads(self.text))
+        self.check_clone(objson.loads(self.text, lazy=True))
+        self.check_clone(json.loads(self.text))
+
+    def test_clone_shares(self):
+        template = objson.loads(self.text)
+        body = objson.clone(template)
+        self.assertIs(template.__dict__, body._raw)
+        body.HostConfig.NetworkMode = 'host'
+        self.assertIs(template.__dict__, body._raw)
+        self.assertIsNot(template.HostConfig.__dict__, body.HostConfig._raw)
+        self.assertIs(template.HostConfig.Binds, body.HostConfig._raw['Binds'])
+        body.Image = 'db'
+        self.assertIsNot(template.__dict__, body._raw)
+        self.assertIs(template.Labels, body._raw['Labels'])
+        self.assertEqual('bridge', template.HostConfig.NetworkMode)
+        self.assertEqual('web', template.Image)
+
+    def test_clone_nested(self):
+        body = objson.clone(self.check_clone(objson.loads(self.text)))
+        body.HostConfig.NetworkMode = 'none'
+        self.assertEqual('none', body.HostConfig.NetworkMode)
+        self.assertEqual([objson.clone(1)], [1])
+        items = objson.clone(objson.loads('[{"a": 1}, [{"b": 2}]]'))
+        items[1][0].b = 3
+        self.assertEqual([{'a': 1}, [{'b': 3}]], json.loads(objson.dumps(items)))
+
+    def test_clone_pickle(self):
+        body = objson.clone(objson.loads(self.text))
+        body.Image = 'db'
+        other = pickle.loads(pickle.dumps(body, 2))
+        self.assertEqual(body, other)
+        other.Labels.env = 'prod'
+        self.assertEqual('gdev', body.Labels.env)
+
+
+class DolphinPickleTestCase(unittest.TestCase):
+    def test_pickle(self):
+        text = r'{"Id": "a1", "status": {"Running": true}, "Ports": [{"PublicPort": 80}], "class": 1}'
+        obj = objson.loads(text)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            other = pickle.loads(pickle.dumps(obj, protocol))
+            self.assertIsInstance(other, objson.dolphin2.Dolphin)
+            self.assertEqual(obj, other)
+            self.assertEqual(80, other.Ports[0].PublicPort)
+            self.assertEqual(1, other.mclass)
+
+    def test_pickle_shared(self):
+        child = objson.empty(dict(name='wendy'))
+        obj = objson.empty(dict(left=child, right=child))
+        obj.self = obj
+        other = pickle.loads(pickle.dumps(obj, 2))
+        self.assertIs(other.left, other.right)
+        self.assertIs(other, other.self)
+
+    def test_copy(self):
+        obj = objson.loads(r'{"name": "wendy", "tags": ["a"]}')
+        shallow = copy.copy(obj)
+        deep = copy.deepcopy(obj)
+        shallow.name = 'benjamin'
+        deep.tags.append('b')
+        self.assertEqual('wendy', obj.name)
+        self.assertEqual(['a'], obj.tags)
+        self.assertIs(obj.tags, shallow.tags)
+
+
+class ProjectionTestCase(unittest.TestCase):
+    text = r'[{"Id": "a1", "Names": ["/web"], "status": {"Running": true, "Pid": 12}, ' \
+           r'"Ports": [{"PublicPort": 80, "Type": "tcp"}], "Labels": {"env": "gdev"}}, ' \
+           r'{"Id": "b2", "Names": ["/db"], "Image": "db"}]'
+
+    def test_fields(self):
+        containers = objson.loads(self.text, fields={'Names', 'Id'})
+        self.assertEqual([{'Id': 'a1', 'Names': ['/web']}, {'Id': 'b2', 'Names': ['/db']}],
+                         json.loads(objson.dumps(containers)))
+        self.assertEqual('/web', containers[0].Names[0])
+        self.assertIsNone(containers[0].status)
+        self.assertEqual(['Id', 'Names'], sorted(containers[1]))
+        self.assertEqual(containers, objson.loads(self.text, fields='Id, Names'))
+
+    def test_fields_nested(self):
+        spec = {'Id': None, 'status': ['Running'], 'Ports': {'PublicPort': True}, 'Labels': None}
+        expected = [{'Id': 'a1', 'status': {'Running': True}, 'Ports': [{'PublicPort': 80}],
+                     'Labels': {'env': 'gdev'}}, {'Id': 'b2'}]
+        for kwargs in ({}, {'lazy': True}, {'intern': True}, {'share': True, 'lazy': True}):
+            containers = objson.loads(self.text, fields=spec, **kwargs)
+            self.assertEqual(expected, json.loads(objson.dumps(containers)))
+            self.assertTrue(containers[0].status.Running)
+            self.assertEqual('gdev', containers[0].Labels.env)
+            self.assertEqual(80, containers[0].Ports[0].PublicPort)
+        self.assertIsInstance(objson.loads(self.text, fields=spec)[0].Labels, objson.dolphin2.Dolphin)
+
+    def test_fields_load(self):
+        obj = objson.load(StringIO(r'{"name": "web", "tags": ["1.0", "latest"]}'), fields=['tags'])
+        self.assertEqual(['1.0', 'latest'], obj.tags)
+        self.assertIsNone(obj.name)
+        self.assertIsNone(objson.loads('{', fields=['tags']))
+        self.assertEqual(1, objson.loads('1', fields=['tags']))
+
+
+class BinaryInputTestCase(unittest.TestCase):
+    text = u'{"Name": "w\xe9ndy", "Tags": ["1.0", "latest"]}'
+
+    def test_encodings(self):
+        for encoding in ('utf-8', 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be',
+                         'utf-32', 'utf-32-le', 'utf-32-be'):
+            data = self.text.encode(encoding)
+            for src in (data, bytearray(data), memoryview(data)):
+                obj = objson.loads(src)
+                self.assertEqual(u'w\xe9ndy', obj.Name, encoding)
+                self.assertEqual(['1.0', 'latest'], obj.Tags)
+
+    def test_options(self):
+        data = memoryview(self.text.encode('utf-16'))
+        self.assertEqual('latest', objson.loads(data, lazy=True).Tags[1])
+        self.assertIsNone(objson.loads(data, fields=['Tags']).Name)
+        self.assertEqual(12, objson.loads(bytearray(b'12')))
+
+    def test_invalid(self):
+        self.assertIsNone(objson.loads(b'{"Name": "\xff"}'))
+        self.assertIsNone(objson.loads(memoryview(b'{"Name"')))
+        self.assertIsNone(objson.loads(bytearray()))
+
+
+class TrackTestCase(unittest.TestCase):
+    text = json.dumps({"Image": "web", "Env": ["A=1"], "HostConfig": {"Memory": 0, "Binds": ["/data"]},
+                       "Containers": [{"Id": "%d" % i, "Names": ["/c%d" % i], "State": {"Running": True}}
+                                      for i in range(100)]})
+
+    def assertEncoded(self, obj, **kwargs):
+        # ``indent`` is not cached, so it gives the text encoded from scratch
+        expected = json.loads(objson.dumps(obj, indent=1))
+        self.assertEqual(expected, json.loads(objson.dumps(obj, **kwargs)))
+        self.assertEqual(expected, json.loads(''.join(objson.iterdumps(obj, **kwargs))))
+
+    def test_track(self):
+        body = objson.track(objson.loads(self.text))
+        self.assertIsInstance(body, objson.dolphin2.TrackedDolphin)
+        self.assertIsInstance(body.Containers, objson.dolphin2.TrackedList)
+        self.assertEqual(json.loads(self.text), json.loads(objson.dumps(body)))
+        self.assertEqual(objson.loads(self.text), body)
+
+        body.HostConfig.Memory = 512
+        self.assertEncoded(body)
+        body.Containers[50].State.Running = False
+        self.assertEncoded(body)
+        body['Labels'] = {'env': 'gdev'}
+        body.Labels.env = 'prd'
+        self.assertEncoded(body)
+        del body.Image
+        self.assertEncoded(body)
+        self.assertFalse(json.loads(objson.dumps(body))['Containers'][50]['State']['Running'])
+
+    def test_track_list(self):
+        body = objson.track(objson.loads(self.text))
+        containers = body.Containers
+        objson.dumps(body)
+        for change in (lambda: containers.append({'Id': 'new'}),
+                       lambda: containers.insert(0, {'Id': 'first'}),
+                       lambda: containers.extend([{'Id': 'a'}, {'Id': 'b'}]),
+                       lambda: containers.pop(),
+                       lambda: containers.remove(containers[1]),
+                       lambda: containers.reverse(),
+                       lambda: containers.sort(key=lambda item: item.Id),
+                       lambda: containers.__setitem__(slice(1, 3), [{'Id': 'slice'}]),
+                       lambda: containers.__delitem__(slice(0, 2)),
+                       lambda: containers[5].Names.append('/alias')):
+            change()
+            self.assertEncoded(body)
+        containers[1:2] = [{'Id': 'simple-slice'}]
+        self.assertEncoded(body)
+        body.Env += ['B=2']
+        self.assertEqual(['A=1', 'B=2'], json.loads(objson.dumps(body))['Env'])
+
+    def test_track_reuse(self):
+        body = objson.track(objson.loads(json.dumps([{"Id": i, "Ports": list(range(300))} for i in range(3)])))
+        objson.dumps(body)
+        text = body[2]._fragment[1]
+        body[0].Id = 'changed'
+        self.assertEqual('changed', json.loads(objson.dumps(body))[0]['Id'])
+        self.assertIs(text, body[2]._fragment[1])
+        self.assertEncoded(body)
+
+    def test_track_shared(self):
+        body = objson.track(objson.loads(self.text))
+        shared = body.Containers[3]
+        body.Primary = shared
+        objson.dumps(body)
+        shared.State.Running = False
+        result = json.loads(objson.dumps(body))
+        self.assertFalse(result['Primary']['State']['Running'])
+        self.assertFalse(result['Containers'][3]['State']['Running'])
+
+    def test_track_options(self):
+        body = objson.track(objson.loads(self.text))
+        for kwargs in ({}, {'sort_keys': True}, {'separators': (',', ':')}, {'ensure_ascii': False}):
+            body.HostConfig.Memory += 1
+            self.assertEncoded(body, **kwargs)
+        self.assertEqual(objson.dumps(objson.loads(self.text), sort_keys=True),
+                         objson.dumps(objson.track(objson.loads(self.text)), sort_keys=True))
+        io = StringIO()
+        objson.dump(body, io)
+        self.assertEqual(json.loads(objson.dumps(body)), json.loads(io.getvalue()))
+
+    def test_track_copy(self):
+        body = objson.track(objson.loads(self.text))
+        objson.dumps(body)
+        for other in (pickle.loads(pickle.dumps(body)), pickle.loads(pickle.dumps(body, 2)), copy.deepcopy(body)):
+            self.assertIsInstance(other.Containers, objson.dolphin2.TrackedList)
+            self.assertEqual(body, other)
+            other.Containers[0].Names.append('/alias')
+            self.assertEncoded(other)
+            self.assertEqual(['/c0'], body.Containers[0].Names)
+
+    def test_track_circular(self):
+        body = objson.track(objson.loads(self.text))
+        body.Containers[0].Self = body
+        self.assertRaises(ValueError, objson.dumps, body)
+        self.assertIs(body, objson.track(body))
+        self.assertEqual(1, objson.track(1))
+
+
+class DolphinEncoderTestCase(unittest.TestCase):
+    def test_dumps_mixed_tree(self):
+        entity = objson.make_dynamic_class('Entity', 'name,age')
+        compact = objson.make_dynamic_class('Compact', 'name,age', slots=True)
+        obj = objson.empty(dict(plain=entity({'name': 'benjamin', 'age': 21}),
+                                compact=compact({'name': 'wendy', 'age': 20}),
+                                lazy=objson.loads(r'{"nested": {"value": [1, 2]}}', lazy=True),
+                                items=[objson.empty(dict(id=1)), {'id': 2}]))
+        expected = {'plain': {'name': 'benjamin', 'age': 21},
+                    'compact': {'name': 'wendy', 'age': 20},
+                    'lazy': {'nested': {'value': [1, 2]}},
+                    'items': [{'id': 1}, {'id': 2}]}
+        self.assertEqual(expected, json.loads(objson.dumps(obj)))
+        self.assertEqual(expected, json.loads(objson.dumps(obj, sort_keys=True, indent=2)))
+        self.assertEqual(expected, json.loads(objson.dolphin2.DolphinEncoder().encode(obj)))
+
+    def test_dumps_unknown(self):
+        # indexable and iterable, but not a mapping of its fields
+        for value in (collections.deque([1, 0, 1]), object(), frozenset([1])):
+            self.assertRaises(TypeError, objson.dumps, value)
+            self.assertRaises(TypeError, objson.dumps, {'value': value}, sort_keys=True)
+
+
+class DolphinAliasTestCase(unittest.TestCase):
+    def test_contains(self):
+        obj = objson.loads(r'{"name": "benjamin", "content-type": "json", "0file": 1}')
+        self.assertIn('name', obj)
+        self.assertIn('content-type', obj)
+        self.assertNotIn('content_type', obj)
+        self.assertNotIn('missing', obj)
+        obj[1] = 'one'
+        self.assertIn(1, obj)
+        self.assertIn('1', obj)
+
+        lazy = objson.loads(r'{"name": "benjamin"}', lazy=True)
+        self.assertIn('name', lazy)
+        self.assertNotIn('missing', lazy)
+
+    def test_alias_cached(self):
+        obj = objson.loads(r'{"content-type": "json", "class": 1, "0file": 2, "m_x": 3}')
+        for _ in range(2):
+            self.assertEqual("json", obj.content_type)
+            self.assertEqual(1, obj.mclass)
+            self.assertEqual(2, obj.m0file)
+            self.assertEqual(3, obj.m_x)
+            self.assertIsNone(obj.missing)
+        self.assertEqual('content-type', objson.dolphin2._alias('content_type'))
+        self.assertIsNone(objson.dolphin2._alias('missing'))
+
+        obj['content_type'] = 'xml'
+        self.assertEqual('xml', obj.content_type)
+        self.assertEqual('json', obj['content-type'])
+
+
+class InternTestCase(unittest.TestCase):
+    text = json.dumps([{"Id": "%d" % i, "Image": "docker.neg/centos:7", "State": "running",
+                        "Ports": [{"IP": "0.0.0.0", "PrivatePort": 80, "Type": "tcp"}],
+                        "Labels": {"env": "gdev", "enabled": True}} for i in range(3)])
+
+    def test_intern(self):
+        items = objson.loads(self.text, intern=True)
+        self.assertEqual(json.loads(self.text), json.loads(objson.dumps(items)))
+        self.assertIs(items[0].Image, items[1].Image)
+        self.assertIs(items[0].State, items[2].State)
+        self.assertIsNot(items[0].Ports[0], items[1].Ports[0])
+
+    def test_share(self):
+        items = objson.loads(self.text, share=True)
+        self.assertEqual(json.loads(self.text), json.loads(objson.dumps(items)))
+        self.assertIs(items[0].Ports[0], items[1].Ports[0])
+        self.assertIs(items[0].Labels, items[2].Labels)
+        self.assertIsNot(items[0], items[1])
+
+    def test_share_types(self):
+        items = objson.loads(r'[{"v": 1}, {"v": true}, {"v": 1.0}, {"v": "1"}, {"v": 1}]', share=True)
+        self.assertEqual([1, True, 1.0, "1", 1], [item.v for item in items])
+        self.assertIs(type(True), type(items[1].v))
+        self.assertEqual(4, len(set(id(item) for item in items)))
+        self.assertIs(items[0], items[4])
+
+    def test_share_lazy(self):
+        items = objson.loads(self.text, share=True, lazy=True)
+        self.assertEqual("gdev", items[1].Labels.env)
+        self.assertEqual(json.loads(self.text), json.loads(objson.dumps(items)))
+        self.assertIsNone(objson.loads('{', intern=True))
@@ -0,0 +1,122 @@
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+import json
+import unittest
+
+from simplekit import objson
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+__author__ = 'benjamin.c.yan'
+
+
+class CountingBackend(object):
+    """a custom backend delegates to stdlib json"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def load(self, fp, **kwargs):
+        self.calls += 1
+        return json.load(fp, **kwargs)
+
+    def loads(self, s, **kwargs):
+        self.calls += 1
+        return json.loads(s, **kwargs)
+
+    def dump(self, obj, fp, **kwargs):
+        self.calls += 1
+        return json.dump(obj, fp, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        self.calls += 1
+        return json.dumps(obj, **kwargs)
+
+
+class BackendConformance(object):
+    backend = None
+
+    def setUp(self):
+        self.previous = objson.get_backend()
+        objson.set_backend(self.backend)
+
+    def tearDown(self):
+        objson.set_backend(self.previous)
+
+    def test_loads_basic(self):
+        tests = [(r'"ben"', "ben"), ('1', 1), ('3.1415', 3.1415), ('true', True), ('null', None), ('[]', [])]
+        for text, expected in tests:
+            self.assertEqual(expected, objson.loads(text))
+
+    def test_loads_normal(self):
+        text = r'{"sort":true, "name":{"first":"benjamin", "last": "yan"}, "class": 1, "from-cookie": 2}'
+        for obj in (objson.loads(text), objson.loads(text, lazy=True), objson.load(StringIO(text))):
+            self.assertTrue(obj.sort)
+            self.assertEqual("benjamin", obj.name.first)
+            self.assertEqual("yan", obj['name']['last'])
+            self.assertEqual(1, obj.mclass)
+            self.assertEqual(2, obj.from_cookie)
+
+    def test_loads_exceptions(self):
+        self.assertIsNone(objson.loads("{"))
+        self.assertIsNone(objson.loads("{", lazy=True))
+
+    def test_dumps(self):
+        text = r'{"name": {"first": "benjamin"}, "items": [{"id": 1}, 2]}'
+        obj = objson.loads(text)
+        obj.age = 30
+        expected = json.loads(text)
+        expected['age'] = 30
+        self.assertEqual(expected, json.loads(objson.dumps(obj)))
+        self.assertEqual(expected, json.loads(objson.dumps(obj, sort_keys=True)))
+        fp = StringIO()
+        objson.dump(obj, fp)
+        self.assertEqual(expected, json.loads(fp.getvalue()))
+
+
+class StdlibBackendTestCase(BackendConformance, unittest.TestCase):
+    backend = 'stdlib'
+
+    def test_selected(self):
+        self.assertIs(json, objson.get_backend())
+
+
+@unittest.skipIf(simplejson is None, 'simplejson is not installed')
+class SimplejsonBackendTestCase(BackendConformance, unittest.TestCase):
+    backend = 'simplejson'
+
+    def test_selected(self):
+        self.assertIs(simplejson, objson.get_backend())
+
+
+class CustomBackendTestCase(BackendConformance, unittest.TestCase):
+    backend = CountingBackend()
+
+    def test_selected(self):
+        calls = self.backend.calls
+        objson.loads('{}')
+        objson.dumps({})
+        self.assertEqual(calls + 2, self.backend.calls)
+
+
+class BackendRegistryTestCase(unittest.TestCase):
+    def tearDown(self):
+        objson.set_backend('stdlib')
+
+    def test_fallback(self):
+        objson.register_backend('missing', 'simplekit_missing_json_module')
+        self.assertIs(json, objson.set_backend('missing'))
+
+    def test_unicode_name(self):
+        self.assertIs(json, objson.set_backend(u'json'))
+        self.assertIs(json, objson.set_backend(u'stdlib'))
+
+    def test_invalid(self):
+        self.assertRaises(TypeError, objson.set_backend, object())
+        self.assertIs(json, objson.get_backend())
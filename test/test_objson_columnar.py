@@ -0,0 +1,83 @@
+import json
+import unittest
+from array import array
+
+from simplekit import objson
+
+__author__ = 'benjamin.c.yan'
+
+CONTAINERS = json.dumps([
+    {"Id": "a1", "Names": ["/web"], "Created": 1460000000, "Cpu": 0.5, "State": "running",
+     "status": {"Running": True}, "content-type": "json"},
+    {"Id": "b2", "Names": ["/db"], "Created": 1460000001, "Cpu": 1.5, "State": "exited",
+     "status": {"Running": False}},
+    {"Id": "c3", "Names": ["/cache"], "Created": 1460000002, "Cpu": 2.5, "State": "running",
+     "status": {"Running": True}, "Ports": [{"PublicPort": 80}]},
+])
+
+
+class ColumnarTestCase(unittest.TestCase):
+    def test_loads_columnar(self):
+        table = objson.loads_columnar(CONTAINERS)
+        self.assertEqual(3, len(table))
+        self.assertEqual(['Cpu', 'Created', 'Id', 'Names', 'Ports', 'State', 'content-type', 'status'],
+                         table.columns)
+        self.assertEqual(['a1', 'b2', 'c3'], table.Id)
+        self.assertIsInstance(table.Created, array)
+        self.assertIsInstance(table.Cpu, array)
+        self.assertEqual([0.5, 1.5, 2.5], list(table.Cpu))
+        self.assertEqual(['json', None, None], table.content_type)
+        self.assertIsNone(table.missing)
+
+    def test_rows(self):
+        table = objson.loads_columnar(CONTAINERS)
+        row = table[0]
+        self.assertEqual('a1', row.Id)
+        self.assertEqual(['/web'], row.Names)
+        self.assertTrue(row.status.Running)
+        self.assertEqual('json', row.content_type)
+        self.assertIsNone(row.Ports)
+        self.assertEqual(80, table[-1].Ports[0].PublicPort)
+        self.assertEqual(['a1', 'b2', 'c3'], [item.Id for item in table])
+        self.assertRaises(IndexError, table.__getitem__, 3)
+
+        row['State'] = 'paused'
+        self.assertEqual('paused', table.State[0])
+        self.assertEqual(json.loads(CONTAINERS)[1], dict((key, value) for key, value in
+                                                         json.loads(objson.dumps(table[1])).items()
+                                                         if value is not None))
+
+    def test_where_take(self):
+        table = objson.loads_columnar(CONTAINERS)
+        running = table.where('State', lambda state: state == 'running')
+        self.assertEqual(['a1', 'c3'], running.Id)
+        self.assertEqual([1460000000, 1460000002], list(running.Created))
+        self.assertIsInstance(running.Created, array)
+        self.assertEqual(['b2'], table[1:2].Id)
+        self.assertEqual(0, len(table.where('missing', bool)))
+
+    def test_dumps_columns(self):
+        for sizes in ([1, 0, 1], [10, 20, 20], [0.5, 1.5]):
+            table = objson.loads_columnar(json.dumps([{"Size": size} for size in sizes]))
+            self.assertIsInstance(table.Size, array)
+            self.assertEqual(sizes, json.loads(objson.dumps(table.Size)))
+            self.assertEqual({'Size': sizes}, json.loads(objson.dumps({'Size': table.Size}, sort_keys=True)))
+            objs = objson.loads(json.dumps([{"Size": size} for size in sizes]))
+            self.assertEqual(sizes, json.loads(objson.dumps(objson.compile_path('Size').many(objs, column=True))))
+
+    def test_shadowed_fields(self):
+        table = objson.loads_columnar('[{"take": 1, "where": "a"}, {"take": 2, "where": "b"}]')
+        self.assertEqual([1, 2], list(table.column('take')))
+        self.assertEqual(['a', 'b'], table.column('where'))
+        self.assertEqual(2, table[1].take)
+
+    def test_loads_columnar_invalid(self):
+        self.assertIsNone(objson.loads_columnar('['))
+        self.assertIsNone(objson.loads_columnar('{"Id": 1}'))
+        self.assertIsNone(objson.loads_columnar('[1, 2]'))
+        self.assertEqual(0, len(objson.loads_columnar('[]')))
+
+    def test_mixed_numbers(self):
+        table = objson.loads_columnar('[{"v": 1, "b": true}, {"v": 1.5, "b": false}, {"v": 99999999999999999999}]')
+        self.assertEqual([1, 1.5, 99999999999999999999], table.v)
+        self.assertEqual([True, False, None], table.b)
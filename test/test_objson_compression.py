@@ -0,0 +1,142 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from simplekit import objson
+from simplekit.objson import compression
+
+__author__ = 'benjamin.c.yan'
+
+
+def compress(data, kind):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS if kind == 'gzip' else zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CountingIO(object):
+    def __init__(self, data):
+        self._io = io.BytesIO(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        data = self._io.read(size)
+        self.reads.append(len(data))
+        return data
+
+
+class CompressedLoadTestCase(unittest.TestCase):
+    doc = {"Total": 300, "Containers": [{"Id": "%d" % i, "Name": u"w\xe9ndy-%d" % i, "Ports": [80, 443]}
+                                        for i in range(300)]}
+    data = json.dumps(doc).encode('utf-8')
+
+    def test_load(self):
+        for kind, data in (('gzip', compress(self.data, 'gzip')), ('zlib', compress(self.data, 'zlib')),
+                           ('auto', compress(self.data, 'gzip')), ('auto', compress(self.data, 'zlib')),
+                           ('auto', self.data)):
+            obj = objson.load(io.BytesIO(data), compression=kind)
+            self.assertEqual(300, obj.Total)
+            self.assertEqual(u'w\xe9ndy-12', obj.Containers[12].Name)
+            self.assertEqual(self.doc, json.loads(objson.dumps(obj)))
+
+    def test_load_options(self):
+        data = compress(self.data, 'gzip')
+        obj = objson.load(io.BytesIO(data), compression='gzip', lazy=True)
+        self.assertIsInstance(obj, objson.dolphin2.LazyDolphin)
+        self.assertEqual([80, 443], obj.Containers[3].Ports)
+        obj = objson.load(io.BytesIO(data), compression='auto', fields=['Total'])
+        self.assertEqual(['Total'], list(obj))
+        obj = objson.load(io.BytesIO(data), compression='gzip', intern=True)
+        self.assertEqual(self.doc, json.loads(objson.dumps(obj)))
+
+    def test_load_chunks(self):
+        text = b'[' + b', '.join([b'{"text": "' + b'x' * 1000 + b'"}'] * 1000) + b']'
+        data = compress(text, 'gzip')
+        fp = CountingIO(data)
+        reader = compression.reader(fp, 'gzip', chunk_size=256)
+        sizes = []
+        while True:
+            piece = reader.read(4096)
+            if not piece:
+                break
+            sizes.append(len(piece))
+        self.assertEqual(len(text), sum(sizes))
+        self.assertTrue(max(sizes) <= 4096)
+        self.assertTrue(max(fp.reads) <= 256)
+        self.assertEqual(1000, len(objson.load(io.BytesIO(data), compression='gzip')))
+
+    def test_load_window(self):
+        # the first window of the decoder ends right after the '.' of the number
+        text = b'[' + b' ' * 65533 + b'1.5, 2]'
+        self.assertEqual(b'1.', text[65534:65536])
+        for kind in ('gzip', 'zlib'):
+            self.assertEqual([1.5, 2], objson.load(io.BytesIO(compress(text, kind)), compression=kind))
+            self.assertEqual([1.5, 2], objson.load(io.BytesIO(compress(text, kind)), compression='auto'))
+
+    def test_load_members(self):
+        data = compress(b'{"Names": [1, ', 'gzip') + compress(b'2]}', 'gzip')
+        self.assertEqual([1, 2], objson.load(io.BytesIO(data), compression='gzip').Names)
+
+    def test_load_invalid(self):
+        self.assertIsNone(objson.load(io.BytesIO(b'{"Total": 1}'), compression='gzip'))
+        self.assertIsNone(objson.load(io.BytesIO(compress(self.data, 'gzip')[:500]), compression='gzip'))
+        self.assertIsNone(objson.load(io.BytesIO(compress(b'{"Total": ', 'zlib')), compression='zlib'))
+        for kind in ('gzip', 'zlib'):
+            for cut in (1, 4, 8):
+                data = compress(b'[1, 2]', kind)[:-cut]
+                self.assertIsNone(objson.load(io.BytesIO(data), compression=kind))
+                self.assertIsNone(objson.load(io.BytesIO(data), compression='auto'))
+        self.assertRaises(ValueError, objson.load, io.BytesIO(self.data), compression='bz2')
+
+    def test_loads(self):
+        self.assertEqual({}, objson.loads('{}', compression=None))
+        self.assertEqual(300, objson.loads(self.data, compression=None).Total)
+        self.assertRaises(TypeError, objson.loads, compress(self.data, 'gzip'), compression='gzip')
+        self.assertRaises(TypeError, objson.loads, '{}', compression='auto')
+
+    def test_detect(self):
+        self.assertEqual('gzip', compression.detect(compress(b'[]', 'gzip')))
+        self.assertEqual('zlib', compression.detect(compress(b'[]', 'zlib')))
+        for text in (b'{"a": 1}', b'[1]', b'"x"', b' 1', b'x', b'', b'80', b'800', b'8a', b'Hx'):
+            self.assertIsNone(compression.detect(text))
+        self.assertEqual(800, objson.load(io.BytesIO(b'800'), compression='auto'))
+        self.assertEqual(80, objson.load(io.BytesIO(b'80'), compression='auto'))
+
+
+class CompressedDumpTestCase(unittest.TestCase):
+    def setUp(self):
+        self.obj = objson.loads(json.dumps([{"Id": "%d" % i, "Name": u"w\xe9ndy"} for i in range(2000)]))
+        self.expected = json.loads(objson.dumps(self.obj))
+
+    def test_dump(self):
+        fp = io.BytesIO()
+        objson.dump(self.obj, fp, compression='gzip')
+        text = gzip.GzipFile(fileobj=io.BytesIO(fp.getvalue())).read().decode('utf-8')
+        self.assertEqual(self.expected, json.loads(text))
+
+        fp = io.BytesIO()
+        objson.dump(self.obj, fp, compression='zlib', buffer_size=1024, sort_keys=True)
+        text = zlib.decompress(fp.getvalue()).decode('utf-8')
+        self.assertEqual(objson.dumps(self.obj, sort_keys=True), text)
+        self.assertEqual(self.obj, objson.load(io.BytesIO(fp.getvalue()), compression='auto'))
+
+    def test_dump_auto(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        for name, magic in (('snapshot.json.gz', b'\x1f\x8b'), ('snapshot.json', b'[{')):
+            name = os.path.join(path, name)
+            with open(name, 'wb') as fp:
+                objson.dump(self.obj, fp, compression='auto')
+            with open(name, 'rb') as fp:
+                self.assertEqual(magic, fp.read(2))
+            with open(name, 'rb') as fp:
+                self.assertEqual(self.expected, json.loads(objson.dumps(objson.load(fp, compression='auto'))))
+
+        fp = io.BytesIO()
+        objson.dump([1, 2], fp, compression='auto')
+        self.assertEqual(b'[1, 2]', fp.getvalue())
+        self.assertRaises(ValueError, objson.dump, [1], io.BytesIO(), compression='lzma')
@@ -0,0 +1,77 @@
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+import unittest
+
+from simplekit import objson
+from simplekit.objson import dolphin
+
+__author__ = 'benjamin.c.yan'
+
+TEXT = r'{"Id": "a1", "status": {"Running": true}, "Ports": [{"PublicPort": 80}]}'
+
+
+class StatsTestCase(unittest.TestCase):
+    def setUp(self):
+        objson.enable_stats(False)
+        objson.set_slow_hook(None)
+        objson.reset_stats()
+
+    tearDown = setUp
+
+    def test_disabled(self):
+        objson.loads(TEXT)
+        objson.dumps(objson.loads(TEXT))
+        stats = objson.stats()
+        self.assertFalse(stats['enabled'])
+        self.assertEqual(0, stats['decode_calls'])
+        self.assertEqual(0, stats['encode_calls'])
+
+    def test_decode(self):
+        objson.enable_stats()
+        objson.loads(TEXT)
+        objson.loads(TEXT, intern=True)
+        objson.load(StringIO(TEXT))
+        self.assertIsNone(objson.loads('{'))
+        stats = objson.stats()
+        self.assertTrue(stats['enabled'])
+        self.assertEqual(4, stats['decode_calls'])
+        self.assertEqual(len(TEXT) * 2 + 1, stats['bytes_in'])
+        self.assertEqual(9, stats['objects'])
+        self.assertEqual(1, stats['errors'])
+        self.assertGreater(stats['decode_time'], 0)
+
+    def test_encode(self):
+        obj = objson.loads(TEXT)
+        objson.enable_stats()
+        text = objson.dumps(obj)
+        io = StringIO()
+        objson.dump(obj, io)
+        stats = objson.stats()
+        self.assertEqual(2, stats['encode_calls'])
+        self.assertEqual(len(text) + len(io.getvalue()), stats['bytes_out'])
+        self.assertGreater(stats['encode_time'], 0)
+
+        objson.reset_stats()
+        self.assertEqual(0, objson.stats()['encode_calls'])
+
+    def test_shape_classes(self):
+        dolphin.clear_cache()
+        objson.enable_stats()
+        dolphin.loads(TEXT)
+        dolphin.loads(TEXT)
+        self.assertEqual(3, objson.stats()['shape_classes'])
+
+    def test_slow_hook(self):
+        calls = []
+        objson.set_slow_hook(lambda name, seconds, size: calls.append((name, size)), threshold=0)
+        objson.dumps(objson.loads(TEXT))
+        self.assertEqual([('loads', len(TEXT)), ('dumps', len(objson.dumps(objson.loads(TEXT))))], calls[:2])
+        self.assertEqual(0, objson.stats()['decode_calls'])
+
+        del calls[:]
+        objson.set_slow_hook(lambda name, seconds, size: calls.append(name), threshold=60)
+        objson.loads(TEXT)
+        self.assertEqual([], calls)
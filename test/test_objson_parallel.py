@@ -0,0 +1,53 @@
+import json
+import unittest
+
+from simplekit import objson
+from simplekit.objson import parallel
+from simplekit.objson.dolphin2 import Dolphin, LazyDolphin
+
+__author__ = 'benjamin.c.yan'
+
+TEXTS = [json.dumps({"Id": i, "Names": ["/svc-%d" % i], "status": {"Running": i % 2 == 0},
+                     "content-type": "json"}) for i in range(50)]
+
+
+class LoadsManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.threshold = parallel.PARALLEL_THRESHOLD
+        parallel.PARALLEL_THRESHOLD = 0
+
+    def tearDown(self):
+        parallel.PARALLEL_THRESHOLD = self.threshold
+
+    def check(self, objs, texts=TEXTS):
+        self.assertEqual(len(texts), len(objs))
+        for i, obj in enumerate(objs):
+            self.assertEqual(i, obj.Id)
+            self.assertEqual(['/svc-%d' % i], obj.Names)
+            self.assertEqual(i % 2 == 0, obj.status.Running)
+            self.assertEqual('json', obj.content_type)
+            self.assertEqual(json.loads(texts[i]), json.loads(objson.dumps(obj)))
+
+    def test_pool(self):
+        objs = objson.loads_many(TEXTS, workers=2, chunksize=7)
+        self.assertIs(Dolphin, type(objs[0]))
+        self.check(objs)
+
+    def test_in_process(self):
+        parallel.PARALLEL_THRESHOLD = self.threshold
+        self.check(objson.loads_many(iter(TEXTS), workers=2))
+        self.check(objson.loads_many(TEXTS, workers=1))
+
+    def test_lazy(self):
+        objs = objson.loads_many(TEXTS, workers=2, lazy=True)
+        self.assertIsInstance(objs[0], LazyDolphin)
+        self.check(objs)
+
+    def test_invalid_and_scalars(self):
+        texts = ['[{"name": "wendy"}]', 'invalid', '1', '"text"', 'null']
+        objs = objson.loads_many(texts, workers=2, chunksize=1)
+        self.assertEqual('wendy', objs[0][0].name)
+        self.assertEqual([None, 1, 'text', None], objs[1:])
+
+    def test_empty(self):
+        self.assertEqual([], objson.loads_many([]))
@@ -0,0 +1,55 @@
+import json
+import unittest
+from array import array
+
+from simplekit import objson
+
+__author__ = 'benjamin.c.yan'
+
+CONTAINERS = json.dumps([
+    {"Id": "a1", "Names": ["/web", "/web-alias"], "status": {"Running": True}, "SizeRw": 10,
+     "Ports": [{"PublicPort": 80}, {"PublicPort": 443}], "from-cookie": True},
+    {"Id": "b2", "Names": ["/db"], "status": {"Running": False}, "SizeRw": 20, "Ports": []},
+    {"Id": "c3", "Names": [], "SizeRw": 30},
+])
+
+
+class CompilePathTestCase(unittest.TestCase):
+    def setUp(self):
+        self.containers = objson.loads(CONTAINERS)
+
+    def test_path(self):
+        container = self.containers[0]
+        self.assertTrue(objson.compile_path('status.Running')(container))
+        self.assertEqual('/web', objson.compile_path('Names[0]')(container))
+        self.assertEqual('/web-alias', objson.compile_path('Names[-1]')(container))
+        self.assertEqual(443, objson.compile_path('Ports[1].PublicPort')(container))
+        self.assertTrue(objson.compile_path('from-cookie')(container))
+        self.assertEqual('a1', objson.compile_path('[0].Id')(self.containers))
+
+    def test_missing(self):
+        self.assertIsNone(objson.compile_path('status.Running')(self.containers[2]))
+        self.assertIsNone(objson.compile_path('Names[0]')(self.containers[2]))
+        self.assertIsNone(objson.compile_path('Id[0].missing')(self.containers[2]))
+        self.assertIsNone(objson.compile_path('missing[*].Id')(self.containers[2]))
+        self.assertIsNone(objson.compile_path('[5].Id')(self.containers))
+
+    def test_wildcard(self):
+        self.assertEqual(['/web', '/db', None], objson.compile_path('[*].Names[0]')(self.containers))
+        self.assertEqual([[80, 443], [], None], objson.compile_path('[*].Ports[*].PublicPort')(self.containers))
+        self.assertEqual(['/web', '/web-alias'], objson.compile_path('[0].Names[*]')(self.containers))
+
+    def test_many(self):
+        running = objson.compile_path('status.Running')
+        self.assertEqual([True, False, None], running.many(self.containers))
+        self.assertEqual([True, False, None], running.many(iter(self.containers)))
+        sizes = objson.compile_path('SizeRw').many(self.containers, column=True)
+        self.assertIsInstance(sizes, array)
+        self.assertEqual([10, 20, 30], list(sizes))
+        lazy = objson.loads(CONTAINERS, lazy=True)
+        self.assertEqual([True, False, None], running.many(lazy))
+
+    def test_invalid(self):
+        for path in ('', '.Id', 'status..Running', 'status.', 'Names.[0]', 'Names[0]Id', 'Names[x]', 'Names[0'):
+            self.assertRaises(ValueError, objson.compile_path, path)
+        self.assertEqual("Path('status.Running')", repr(objson.compile_path('status.Running')))
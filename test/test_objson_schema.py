@@ -0,0 +1,94 @@
+import json
+import unittest
+
+from simplekit import objson
+
+__author__ = 'benjamin.c.yan'
+
+CONTAINERS = r'''[{"Id": "a1", "Names": ["/web"], "Created": "1460000000", "SizeRw": 12.0,
+                   "Ports": [{"PrivatePort": 80, "PublicPort": "8080", "Type": "tcp"}],
+                   "status": {"Running": true, "Pid": 12}, "Labels": {"env": "gdev"},
+                   "from-cookie": "true", "class": 2, "Extra": {"value": 1}},
+                  {"Id": "b2", "Names": ["/db"], "Created": 1460000001, "SizeRw": null,
+                   "Ports": [], "status": {"Running": false}, "Labels": null}]'''
+
+SCHEMA = [{'Id': str, 'Names': [str], 'Created': int, 'SizeRw': int,
+           'Ports': [{'PrivatePort': int, 'PublicPort': int, 'Type': str}],
+           'status': {'Running': bool, 'Pid': int},
+           'Labels': None, 'from-cookie': bool, 'class': int}]
+
+
+class CompileTestCase(unittest.TestCase):
+    def test_compile_loads(self):
+        decoder = objson.compile(SCHEMA, name='Container')
+        first, second = decoder.loads(CONTAINERS)
+        self.assertEqual('Container', type(first).__name__)
+        self.assertEqual('a1', first.Id)
+        self.assertEqual(['/web'], first.Names)
+        self.assertEqual(1460000000, first.Created)
+        self.assertEqual(12, first.SizeRw)
+        self.assertIsInstance(first.SizeRw, int)
+        self.assertEqual(8080, first.Ports[0].PublicPort)
+        self.assertEqual('tcp', first['Ports'][0]['Type'])
+        self.assertTrue(first.status.Running)
+        self.assertEqual('gdev', first.Labels.env)
+        self.assertTrue(first.from_cookie)
+        self.assertEqual(2, first.mclass)
+        self.assertEqual(1, first.Extra['value'])
+
+        self.assertIsNone(second.SizeRw)
+        self.assertIsNone(second.Labels)
+        self.assertIsNone(second.status.Pid)
+        self.assertIsNone(second.from_cookie)
+        self.assertEqual([], second.Ports)
+        self.assertIs(type(first.status), type(second.status))
+
+    def test_compile_dumps(self):
+        decoder = objson.compile(SCHEMA)
+        containers = decoder.loads(CONTAINERS)
+        expected = json.loads(CONTAINERS)
+        for item in expected:
+            item['Created'] = int(item['Created'])
+            for port in item['Ports']:
+                port['PublicPort'] = int(port['PublicPort'])
+        expected[0]['SizeRw'] = 12
+        expected[0]['from-cookie'] = True
+        self.assertEqual(expected, json.loads(objson.dumps(containers)))
+
+    def test_compile_invalid(self):
+        decoder = objson.compile({'Created': int})
+        self.assertIsNone(decoder.loads('{'))
+        self.assertIsNone(decoder.loads('{"Created": "now"}'))
+        self.assertIsNone(decoder.loads('[1]'))
+        self.assertIsNone(decoder.loads('null'))
+        self.assertRaises(ValueError, objson.compile, [int, str])
+        self.assertRaises(ValueError, objson.compile, {'name': 'text'})
+
+    def test_compile_coercions(self):
+        decoder = objson.compile({'Count': int, 'Ratio': float, 'Running': bool, 'Id': str})
+        obj = decoder.loads('{"Count": "12", "Ratio": "0.5", "Running": "False", "Id": 7}')
+        self.assertEqual((12, 0.5, False, '7'), (obj.Count, obj.Ratio, obj.Running, obj.Id))
+        obj = decoder.loads('{"Count": 3.0, "Ratio": 2, "Running": true, "Id": "a1"}')
+        self.assertEqual((3, 2.0, True, 'a1'), (obj.Count, obj.Ratio, obj.Running, obj.Id))
+        self.assertIsInstance(obj.Count, int)
+        self.assertIsInstance(obj.Ratio, float)
+        for text in ('{"Count": 1.5}', '{"Count": "1.5"}', '{"Count": [1]}',
+                     '{"Ratio": "fast"}', '{"Ratio": {}}', '{"Ratio": false}',
+                     '{"Running": "false-ish"}', '{"Running": 1}', '{"Running": [true]}',
+                     '{"Id": {"value": 1}}', '{"Id": true}'):
+            self.assertIsNone(decoder.loads(text), text)
+        self.assertIsNone(objson.compile({'Id': complex}).loads('{"Id": [1]}'))
+        self.assertRaises(ValueError, objson.compile, {'name': 'text'})
+
+
+class DynamicClassFieldTestCase(unittest.TestCase):
+    def test_missing_fields(self):
+        entity = objson.make_dynamic_class('Entity', 'name,class,from-cookie')
+        obj = entity({'name': 'benjamin'})
+        self.assertEqual('benjamin', obj.name)
+        self.assertIsNone(obj.mclass)
+        self.assertIsNone(obj.from_cookie)
+        self.assertRaises(AttributeError, getattr, obj, 'unknown')
+        obj.from_cookie = True
+        self.assertTrue(obj['from-cookie'])
+        self.assertNotIn('name', type(obj).__dict__)
@@ -0,0 +1,228 @@
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+import json
+import os
+import unittest
+
+from simplekit import objson
+
+__author__ = 'benjamin.c.yan'
+
+
+class CountingIO(object):
+    def __init__(self, text):
+        self._io = StringIO(text)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = self._io.read(size)
+        self.consumed += len(data)
+        return data
+
+
+class IterloadTestCase(unittest.TestCase):
+    def test_iterload_array(self):
+        fp = StringIO(r'[{"name":"benjamin"}, {"name": "wendy"}, 1, "text", [1, 2]]')
+        items = list(objson.iterload(fp))
+        self.assertEqual(5, len(items))
+        self.assertEqual("benjamin", items[0].name)
+        self.assertEqual("wendy", items[1].name)
+        self.assertEqual(1, items[2])
+        self.assertEqual("text", items[3])
+        self.assertEqual([1, 2], items[4])
+
+    def test_iterload_empty(self):
+        self.assertEqual([], list(objson.iterload(StringIO(' [ ] '))))
+
+    def test_iterload_prefix(self):
+        text = r'{"Total": 2, "skip": {"items": [1]}, "data": {"items": [{"Id": "a"}, {"Id": "b"}]}}'
+        items = list(objson.iterload(StringIO(text), prefix='data.items'))
+        self.assertEqual(["a", "b"], [item.Id for item in items])
+
+        self.assertEqual([], list(objson.iterload(StringIO(text), prefix='missing')))
+
+    def test_iterload_small_chunks(self):
+        data = [{"Id": i, "Names": ["/container-%d" % i], "Price": i * 1.5} for i in range(100)]
+        fp = StringIO(json.dumps(data))
+        items = list(objson.iterload(fp, chunk_size=7))
+        self.assertEqual(data, [json.loads(objson.dumps(item)) for item in items])
+
+    def test_iterload_numbers(self):
+        text = '[1.5, 2.25, 3e5, -4.125E-3, 0.5e+10, 6, 70.0]'
+        expected = json.loads(text)
+        for chunk_size in range(1, len(text) + 2):
+            self.assertEqual(expected, list(objson.iterload(StringIO(text), chunk_size=chunk_size)), chunk_size)
+        text = '[' + ' ' * 65533 + '1.5, 2]'
+        self.assertEqual([1.5, 2], list(objson.iterload(StringIO(text))))
+
+    def test_iterload_incremental(self):
+        data = [{"Id": i, "Name": "container-%d" % i} for i in range(10000)]
+        fp = CountingIO(json.dumps(data))
+        items = objson.iterload(fp, chunk_size=1024)
+        first = next(items)
+        self.assertEqual(0, first.Id)
+        self.assertLess(fp.consumed, 4096)
+
+    def test_iterload_malformed(self):
+        self.assertRaises(ValueError, list, objson.iterload(StringIO('[1, 2')))
+        self.assertRaises(ValueError, list, objson.iterload(StringIO('{"a": 1}')))
+
+
+class CountingWriter(object):
+    def __init__(self):
+        self._io = StringIO()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self._io.write(data)
+
+    def getvalue(self):
+        return self._io.getvalue()
+
+
+class JsonLinesTestCase(unittest.TestCase):
+    def test_load_lines(self):
+        fp = StringIO('{"name": "benjamin"}\n\n{"name": "wendy"}\n[1, 2]\n')
+        items = list(objson.load_lines(fp))
+        self.assertEqual(3, len(items))
+        self.assertEqual("benjamin", items[0].name)
+        self.assertEqual("wendy", items[1].name)
+        self.assertEqual([1, 2], items[2])
+
+    def test_load_lines_binary(self):
+        import tempfile
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(u'{"name": "benjamin"}\n\n{"name": "\u00e9"}\n'.encode('utf-8'))
+            with open(path, 'rb') as fp:
+                items = list(objson.load_lines(fp))
+        finally:
+            os.remove(path)
+        self.assertEqual(["benjamin", u"\u00e9"], [item.name for item in items])
+
+    def test_load_lines_malformed(self):
+        self.assertRaises(ValueError, list, objson.load_lines(StringIO('{"name": \n')))
+
+    def test_dump_lines(self):
+        records = [objson.loads(r'{"name": "benjamin", "age": 21}'), {"name": "wendy"}, [1, 2]]
+        fp = StringIO()
+        objson.dump_lines(records, fp)
+        lines = fp.getvalue().splitlines()
+        self.assertEqual([{"name": "benjamin", "age": 21}, {"name": "wendy"}, [1, 2]],
+                         [json.loads(line) for line in lines])
+        self.assertTrue(fp.getvalue().endswith('\n'))
+
+    def test_dump_lines_batch(self):
+        fp = CountingWriter()
+        objson.dump_lines(({"Id": i} for i in range(25)), fp, batch_size=10)
+        self.assertEqual(3, fp.writes)
+        items = list(objson.load_lines(StringIO(fp.getvalue())))
+        self.assertEqual(list(range(25)), [item.Id for item in items])
+
+    def test_dump_lines_empty(self):
+        fp = CountingWriter()
+        objson.dump_lines([], fp)
+        self.assertEqual(0, fp.writes)
+        self.assertRaises(ValueError, objson.dump_lines, [{}], fp, indent=4)
+
+
+class ChunkedDumpTestCase(unittest.TestCase):
+    def setUp(self):
+        self.doc = {"Id": "a1", "Names": ["/web"],
+                    "Containers": [{"Id": i, "Names": ["/svc-%d" % i], "Labels": {"env": "gdev"}}
+                                   for i in range(2000)],
+                    "Hosts": dict(("host-%d" % i, {"Up": i % 2 == 0}) for i in range(500))}
+        self.obj = objson.loads(json.dumps(self.doc))
+
+    def test_dump(self):
+        io = CountingWriter()
+        objson.dump(self.obj, io)
+        self.assertEqual(self.doc, json.loads(io.getvalue()))
+        self.assertLessEqual(io.writes, 5)
+
+        io = CountingWriter()
+        objson.dump(self.obj, io, buffer_size=1024)
+        self.assertEqual(self.doc, json.loads(io.getvalue()))
+        self.assertGreater(io.writes, 50)
+
+    def test_dump_options(self):
+        for kwargs in ({'sort_keys': True}, {'sort_keys': True, 'separators': (',', ':')}, {'indent': 2},
+                       {'sort_keys': True, 'indent': 2}, {'cls': json.JSONEncoder}):
+            io = CountingWriter()
+            objson.dump(self.obj, io, **kwargs)
+            kwargs.pop('cls', None)
+            self.assertEqual(self.doc, json.loads(io.getvalue()))
+            if kwargs.get('sort_keys'):
+                self.assertEqual(json.dumps(self.doc, **kwargs), io.getvalue())
+        io = StringIO()
+        objson.dump(self.obj, io, False, True)
+        self.assertEqual(self.doc, json.loads(io.getvalue()))
+
+    def test_iterdumps(self):
+        pieces = list(objson.iterdumps(self.obj, buffer_size=4096))
+        self.assertGreater(len(pieces), 10)
+        self.assertTrue(all(len(piece) < 4096 * 2 for piece in pieces))
+        self.assertEqual(self.doc, json.loads(''.join(pieces)))
+        self.assertEqual(['[]'], list(objson.iterdumps([])))
+        self.assertEqual(['"text"'], list(objson.iterdumps('text')))
+        self.assertEqual(self.doc, json.loads(''.join(objson.iterdumps(objson.loads(json.dumps(self.doc),
+                                                                                   lazy=True)))))
+
+    def test_iterdumps_circular(self):
+        items = [objson.empty(dict(id=i)) for i in range(500)]
+        items.append(items)
+        self.assertRaises(ValueError, list, objson.iterdumps(items))
+
+
+class LoadPathTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, text):
+        with open(self.path, 'wb') as fp:
+            fp.write(text)
+
+    def test_load_path(self):
+        data = {"name": "benjamin", "class": 1, "items": [{"Id": i, "tags": ["a"] * 3} for i in range(500)],
+                "nested": {"value": 3.5}, "empty": {}, "none": None}
+        self.write(json.dumps(data))
+        for mmap in (True, False):
+            obj = objson.load_path(self.path, mmap=mmap, chunk_size=64)
+            self.assertEqual("benjamin", obj.name)
+            self.assertEqual(1, obj.mclass)
+            self.assertEqual(499, obj.items[-1].Id)
+            self.assertEqual(3.5, obj.nested.value)
+            self.assertEqual(data, json.loads(objson.dumps(obj)))
+
+    def test_load_path_numbers(self):
+        text = '{"values": [1.5, 2.25, 3e5, -4.125E-3, 0.5e+10, 6], "total": 70.0}'
+        self.write(text)
+        for chunk_size in range(1, len(text) + 2):
+            for mmap in (True, False):
+                obj = objson.load_path(self.path, mmap=mmap, chunk_size=chunk_size)
+                self.assertEqual(json.loads(text), json.loads(objson.dumps(obj)), (chunk_size, mmap))
+        self.write('[' + ' ' * 65533 + '1.5, 2]')
+        self.assertEqual([1.5, 2], objson.load_path(self.path))
+        self.assertEqual([1.5, 2], objson.load_path(self.path, mmap=False))
+
+    def test_load_path_values(self):
+        tests = [('[]', []), ('{}', {}), (' 12 ', 12), ('"text"', "text"), ('[1, {"a": 2}]', [1, {"a": 2}])]
+        for text, expected in tests:
+            self.write(text)
+            self.assertEqual(expected, json.loads(objson.dumps(objson.load_path(self.path))))
+
+    def test_load_path_invalid(self):
+        for text in ('', '{', '[1, 2', '{"a": 1} 2', '{"a" 1}'):
+            self.write(text)
+            self.assertIsNone(objson.load_path(self.path))
+            self.assertIsNone(objson.load_path(self.path, mmap=False))